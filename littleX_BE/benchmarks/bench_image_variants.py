@@ -0,0 +1,72 @@
+"""
+Throughput benchmark: image variant rendering, in images per second per core.
+
+Usage:
+    python benchmarks/bench_image_variants.py [--images N] [--width W] [--height H] [--workers N ...]
+"""
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from PIL import Image  # noqa: E402
+
+from image_variants import VARIANT_FORMATS, VARIANT_SIZES, render_variants  # noqa: E402
+
+
+def make_images(directory, count, width, height):
+    """Write ``count`` distinct photo-like JPEGs and return (path, digest) pairs."""
+    images = []
+    for i in range(count):
+        image = Image.effect_mandelbrot((width, height), (-2.0 + i * 0.01, -1.2, 1.0, 1.2), 100 + i)
+        buffer = io.BytesIO()
+        Image.merge("RGB", (image, image.rotate(180), image.transpose(Image.Transpose.FLIP_LEFT_RIGHT))).save(
+            buffer, "JPEG", quality=90
+        )
+        path = Path(directory) / f"source-{i}.jpg"
+        path.write_bytes(buffer.getvalue())
+        images.append((str(path), f"{i:064x}"))
+    return images
+
+
+def run(pool, images, media_dir):
+    start = time.perf_counter()
+    list(pool.map(render_variants, *zip(*images), [media_dir] * len(images)))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--images", type=int, default=24)
+    parser.add_argument("--width", type=int, default=3000)
+    parser.add_argument("--height", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="*", default=None,
+                        help="pool sizes to try (default: 1 and every core)")
+    args = parser.parse_args()
+    cores = os.cpu_count() or 1
+    pool_sizes = args.workers or sorted({1, cores})
+
+    with tempfile.TemporaryDirectory() as source_dir:
+        images = make_images(source_dir, args.images, args.width, args.height)
+        print(f"{args.images} images of {args.width}x{args.height}, "
+              f"sizes {VARIANT_SIZES}, formats {VARIANT_FORMATS}, {cores} cores")
+        print(f"{'workers':>7} {'images/s':>9} {'images/s/core':>14} {'cached images/s':>16}")
+        for workers in pool_sizes:
+            with tempfile.TemporaryDirectory() as media_dir, ProcessPoolExecutor(workers) as pool:
+                # Warm the workers up so process start-up is not measured
+                list(pool.map(abs, range(workers)))
+                cold = run(pool, images, media_dir)
+                warm = run(pool, images, media_dir)
+            rate = args.images / cold
+            print(f"{workers:>7} {rate:>9.2f} {rate / min(workers, cores):>14.2f} {args.images / warm:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
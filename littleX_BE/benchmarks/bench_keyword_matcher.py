@@ -0,0 +1,84 @@
+"""
+Micro-benchmark: indexed keyword matcher vs. the old per-keyword substring loop.
+
+Usage:
+    python benchmarks/bench_keyword_matcher.py [--repeat N] [--sizes N ...]
+"""
+
+import argparse
+import json
+import random
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from keyword_matcher import KeywordMatcher, KEYWORDS_FILE  # noqa: E402
+
+FILLER = (
+    "just landed and grabbed a coffee before the meeting downtown the weather "
+    "is great today and everyone is talking about the new release"
+).split()
+
+
+def legacy_match(keywords, text):
+    """The previous detection: one substring scan per keyword."""
+    text_lower = text.lower()
+    found = []
+    seen = set()
+    for keyword in keywords:
+        if keyword in text_lower and keyword not in seen:
+            found.append(keyword)
+            seen.add(keyword)
+    return found
+
+
+def make_texts(keywords, count, words):
+    rng = random.Random(42)
+    texts = []
+    for _ in range(count):
+        tokens = [rng.choice(FILLER) for _ in range(words)]
+        for _ in range(3):
+            tokens.insert(rng.randrange(len(tokens)), rng.choice(keywords))
+        texts.append(" ".join(tokens))
+    return texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=40)
+    parser.add_argument("--sizes", type=int, nargs="*", default=[1000, 5000],
+                        help="extra dictionary sizes, padded with synthetic keywords")
+    args = parser.parse_args()
+
+    with open(KEYWORDS_FILE, encoding="utf-8") as f:
+        dictionary = json.load(f)
+    base = KeywordMatcher(dictionary)
+    texts = make_texts(list(base.categories), args.texts, args.words)
+
+    print(f"{len(texts)} texts of ~{args.words} words")
+    print(f"{'keywords':>9} {'loop us/text':>13} {'matcher us/text':>16} {'speedup':>8}")
+    for size in [len(base.categories)] + args.sizes:
+        padded = dict(dictionary)
+        padded["synthetic"] = [f"kw{i:05d}" for i in range(max(size - len(base.categories), 0))]
+        matcher = KeywordMatcher(padded)
+        keywords = list(matcher.categories)
+
+        legacy = min(timeit.repeat(lambda: [legacy_match(keywords, t) for t in texts], number=1, repeat=args.repeat))
+        compiled = min(timeit.repeat(lambda: [matcher.match(t) for t in texts], number=1, repeat=args.repeat))
+        per_text = lambda seconds: seconds / len(texts) * 1e6
+        print(f"{len(keywords):>9} {per_text(legacy):>13.2f} {per_text(compiled):>16.2f} {legacy / compiled:>7.2f}x")
+
+    keywords = list(base.categories)
+    false_positives = sum(
+        1 for text in texts
+        if set(legacy_match(keywords, text)) - {k for ks in base.match(text).values() for k in ks}
+    )
+    print(f"texts where the loop reported substring-only hits: {false_positives}/{len(texts)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Overhead benchmark: per-request cost of MetricsMiddleware, in microseconds.
+
+Calls a small FastAPI app directly through ASGI (no sockets, so the
+middleware is not lost in network noise) with and without the middleware,
+and times the raw recording primitives and a /metrics render.
+
+Usage:
+    python benchmarks/bench_metrics.py [--requests N] [--repeat N]
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI  # noqa: E402
+
+from metrics import MetricsMiddleware, http_request_duration, http_requests, registry  # noqa: E402
+
+
+def make_app(with_metrics):
+    app = FastAPI()
+
+    @app.post("/walker/like_tweet/{tweet_id}")
+    async def like_tweet(tweet_id: str):
+        return {"id": tweet_id, "like_count": 1}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def drive(app, requests):
+    """Issue ``requests`` ASGI calls and return the mean seconds per request."""
+    body = {"type": "http.request", "body": b"", "more_body": False}
+
+    async def receive():
+        return body
+
+    async def send(message):
+        pass
+
+    start = time.perf_counter()
+    for i in range(requests):
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+            "scheme": "http", "path": f"/walker/like_tweet/{i}", "raw_path": b"", "root_path": "",
+            "query_string": b"", "headers": [], "client": ("127.0.0.1", 1), "server": ("127.0.0.1", 80)
+        }
+        await app(scope, receive, send)
+    return (time.perf_counter() - start) / requests
+
+
+def best_of(app, requests, repeat):
+    return min(asyncio.run(drive(app, requests)) for _ in range(repeat))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    plain, instrumented = make_app(False), make_app(True)
+    # Build the middleware stacks before timing
+    asyncio.run(drive(plain, 10))
+    asyncio.run(drive(instrumented, 10))
+
+    base = best_of(plain, args.requests, args.repeat)
+    with_metrics = best_of(instrumented, args.requests, args.repeat)
+    print(f"{args.requests} requests through ASGI, best of {args.repeat}")
+    print(f"  without metrics    {base * 1e6:8.2f} us/request")
+    print(f"  with metrics       {with_metrics * 1e6:8.2f} us/request")
+    print(f"  overhead           {(with_metrics - base) * 1e6:8.2f} us/request")
+
+    labels = ("POST", "/walker/like_tweet/{tweet_id}", 200)
+    n = 1_000_000
+    inc = min(timeit.repeat(lambda: http_requests.inc(*labels), number=n, repeat=3)) / n
+    observe = min(timeit.repeat(lambda: http_request_duration.observe(0.003, *labels), number=n, repeat=3)) / n
+    print(f"  counter inc        {inc * 1e6:8.3f} us")
+    print(f"  histogram observe  {observe * 1e6:8.3f} us")
+
+    for route in range(50):
+        for status in (200, 404, 500):
+            http_request_duration.observe(0.01, "POST", f"/route/{route}", status)
+    render = min(timeit.repeat(registry.render, number=20, repeat=3)) / 20
+    print(f"  render /metrics    {render * 1e3:8.2f} ms ({len(registry.render().splitlines())} lines)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Micro-benchmark: cached TweetInfo projection vs. rebuilding it from the graph.
+
+Usage:
+    python benchmarks/bench_tweet_info.py [--tweets N] [--comments N] [--repeat N]
+"""
+
+import argparse
+import sys
+import timeit
+from pathlib import Path
+
+from jaclang.runtimelib.machine import ExecutionContext, JacMachine, JacMachineInterface as Jac
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BASE_DIR))
+JacMachine.set_base_path(str(BASE_DIR))
+JacMachine.set_context(ExecutionContext())
+
+import littleX  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tweets", type=int, default=50)
+    parser.add_argument("--comments", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    root = Jac.root()
+    for i in range(args.tweets):
+        Jac.spawn(root, littleX.create_tweet(content=f"benchmark tweet {i}"))
+    tweets = Jac.spawn(root, littleX.load_feed()).candidates
+    for tweet in tweets:
+        Jac.spawn(tweet, littleX.like_tweet())
+        for j in range(args.comments):
+            Jac.spawn(tweet, littleX.comment_tweet(content=f"comment {j}"))
+
+    rebuilt = min(timeit.repeat(lambda: [t.build_info() for t in tweets], number=1, repeat=args.repeat))
+    cached = min(timeit.repeat(lambda: [t.get_info() for t in tweets], number=1, repeat=args.repeat))
+    feed = min(timeit.repeat(lambda: Jac.spawn(root, littleX.load_feed()), number=1, repeat=args.repeat))
+
+    print(f"{len(tweets)} tweets x {args.comments} comments")
+    print(f"graph traversal (old get_info): {rebuilt * 1000:9.2f} ms")
+    print(f"cached projection:              {cached * 1000:9.2f} ms")
+    print(f"speedup:                        {rebuilt / cached:9.2f}x")
+    print(f"load_feed walker:               {feed * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
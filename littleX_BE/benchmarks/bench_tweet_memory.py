@@ -0,0 +1,113 @@
+"""
+Memory benchmark: bytes per stored tweet, dict records vs. compact records.
+
+"dict" holds each tweet the way the store used to: the JSON-shaped record
+with string ids, ISO timestamps, a likes set and a comments dict of dicts.
+"slots" loads the same records into a TweetStore, which keeps ``__slots__``
+Tweet/Comment objects with binary ids, epoch-int timestamps and interned
+usernames. Both include the id and position indexes.
+
+Usage:
+    python benchmarks/bench_tweet_memory.py [--tweets N] [--users N] [--likes N] [--comments N]
+"""
+
+import argparse
+import gc
+import json
+import random
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from tweet_store import TweetStore  # noqa: E402
+
+
+def make_records(count, users, max_likes, max_comments):
+    """Serialize ``count`` tweet records to JSON lines, as the log stores them."""
+    rng = random.Random(0)
+    names = [f"user_{i}" for i in range(users)]
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    lines = []
+    comment_seq = 0
+    for i in range(count):
+        created = start + timedelta(seconds=i, microseconds=rng.randrange(1_000_000))
+        comments = {}
+        for _ in range(rng.randrange(max_comments + 1)):
+            comment_id = f"comment_{comment_seq}_{int(created.timestamp())}"
+            comment_seq += 1
+            comments[comment_id] = {
+                "id": comment_id,
+                "username": rng.choice(names),
+                "content": "nice one",
+                "created_at": created.isoformat(),
+                "likes": []
+            }
+        lines.append(json.dumps({
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "content": f"tweet number {i} about something",
+            "media": [],
+            "created_at": created.isoformat(),
+            "username": rng.choice(names),
+            "comments": comments,
+            "likes": rng.sample(names, rng.randrange(max_likes + 1))
+        }))
+    return lines
+
+
+def load_dicts(lines):
+    """Hold tweets as the pre-slots store did."""
+    by_id, log, position = {}, [], {}
+    for line in lines:
+        tweet = json.loads(line)
+        tweet["likes"] = set(tweet["likes"])
+        tweet["like_count"] = len(tweet["likes"])
+        by_id[tweet["id"]] = tweet
+        position[tweet["id"]] = len(log)
+        log.append(tweet)
+    return by_id, log, position
+
+
+def load_slots(lines):
+    store = TweetStore()
+    for line in lines:
+        store.apply({"op": "tweet", "tweet": json.loads(line)})
+    return store
+
+
+def measure(loader, lines):
+    """Return the bytes still allocated after ``loader`` builds its store."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = loader(lines)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del store
+    return used
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tweets", type=int, default=100_000)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--likes", type=int, default=3, help="max likes per tweet")
+    parser.add_argument("--comments", type=int, default=1, help="max comments per tweet")
+    args = parser.parse_args()
+
+    lines = make_records(args.tweets, args.users, args.likes, args.comments)
+    print(f"{args.tweets} tweets, {args.users} users, up to {args.likes} likes and {args.comments} comments each")
+    print(f"{'layout':>6} {'MiB':>9} {'bytes/tweet':>12}")
+    results = {}
+    for name, loader in (("dict", load_dicts), ("slots", load_slots)):
+        results[name] = measure(loader, lines)
+        print(f"{name:>6} {results[name] / 2**20:>9.1f} {results[name] / args.tweets:>12.0f}")
+    print(f"saved {1 - results['slots'] / results['dict']:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,383 @@
+"""
+Load test: throughput and p50/p95/p99 latency per endpoint of run_server.py.
+
+By default it starts its own stack in a scratch directory: the upstream
+stub (see ``upstream_stub.py``) standing in for DeepSeek and OpenAI, and
+run_server under uvicorn pointed at it. Pass ``--target`` to drive an
+already running server instead. A fixed number of concurrent clients then
+issue requests drawn from a weighted mix of operations for ``--duration``
+seconds, after an unmeasured ``--warmup``.
+
+Results are written as JSON (``--output``, by default under
+``benchmarks/results/``) and can be compared against an earlier run with
+``--compare``.
+
+Usage:
+    python benchmarks/load_test.py [--concurrency N] [--duration S] [--warmup S]
+        [--mix op=weight,...] [--upstream-latency-ms MS] [--upstream-jitter-ms MS]
+        [--prompt-pool N] [--seed-tweets N] [--storage NAME] [--workers N]
+        [--target URL] [--output PATH] [--compare PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+RESULTS_DIR = BASE_DIR / "benchmarks" / "results"
+
+DEFAULT_MIX = (
+    "load_feed=50,like_tweet=20,create_tweet=10,comment_tweet=10,"
+    "explain=4,analyze_tweet=3,recommend=2,image_info=1"
+)
+STARTUP_TIMEOUT = 60
+
+
+# --- Operations ---
+
+def prompt(state):
+    """Text for an assistant call; ``prompt_pool`` bounds how many are distinct (LLM cache hits)."""
+    n = state.rng.randrange(state.prompt_pool)
+    return f"Load test text {n}: new running shoes and a coffee place in Lisbon"
+
+
+async def create_tweet(client, state):
+    response = await client.post("/walker/create_tweet", json={
+        "content": f"load test tweet {state.rng.random():.6f}", "username": state.username()
+    })
+    if response.status_code == 200:
+        state.tweet_ids.append(response.json()["reports"][0][0]["context"]["id"])
+    return response
+
+
+async def load_feed(client, state):
+    return await client.post("/walker/load_feed", json={"limit": 20, "username": state.username()})
+
+
+async def like_tweet(client, state):
+    return await client.post(f"/walker/like_tweet/{state.tweet_id()}", json={"username": state.username()})
+
+
+async def comment_tweet(client, state):
+    return await client.post(f"/walker/comment_tweet/{state.tweet_id()}", json={
+        "content": "load test comment", "username": state.username()
+    })
+
+
+async def explain(client, state):
+    return await client.post("/assistant/explain", json={"text": prompt(state), "language": "en"})
+
+
+async def analyze_tweet(client, state):
+    return await client.post("/assistant/analyze_tweet", json={"content": prompt(state)})
+
+
+async def recommend(client, state):
+    return await client.post("/assistant/recommend", json={"context": prompt(state)})
+
+
+async def image_info(client, state):
+    n = state.rng.randrange(state.prompt_pool)
+    return await client.post("/assistant/image-info", json={"imageUrl": f"https://example.com/load-test/{n}.jpg"})
+
+
+# name -> (method and path, for the report; coroutine issuing one request)
+OPERATIONS = {
+    "create_tweet": ("POST /walker/create_tweet", create_tweet),
+    "load_feed": ("POST /walker/load_feed", load_feed),
+    "like_tweet": ("POST /walker/like_tweet/{tweet_id}", like_tweet),
+    "comment_tweet": ("POST /walker/comment_tweet/{tweet_id}", comment_tweet),
+    "explain": ("POST /assistant/explain", explain),
+    "analyze_tweet": ("POST /assistant/analyze_tweet", analyze_tweet),
+    "recommend": ("POST /assistant/recommend", recommend),
+    "image_info": ("POST /assistant/image-info", image_info),
+}
+
+
+class LoadState:
+    """What the simulated clients share: known tweet ids, users and the RNG."""
+
+    def __init__(self, seed, users, prompt_pool):
+        self.rng = random.Random(seed)
+        self.users = [f"loaduser{i}" for i in range(users)]
+        self.prompt_pool = prompt_pool
+        self.tweet_ids = []
+
+    def username(self):
+        return self.rng.choice(self.users)
+
+    def tweet_id(self):
+        return self.rng.choice(self.tweet_ids)
+
+
+# --- Measurement ---
+
+def parse_mix(spec):
+    """
+    Parse ``op=weight,...`` into {op: weight}.
+
+    Raises:
+        ValueError: On an unknown operation or a malformed weight
+    """
+    mix = {}
+    for item in spec.split(","):
+        name, _, weight = item.strip().partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation {name!r}; choose from {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return None
+    rank = max(int(round(fraction * len(ordered) + 0.5)) - 1, 0)
+    return ordered[min(rank, len(ordered) - 1)]
+
+
+def summarize(latencies, errors, duration):
+    ordered = sorted(latencies)
+    ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "throughput_rps": round(len(ordered) / duration, 2),
+        "latency_ms": {
+            "p50": ms(percentile(ordered, 0.50)),
+            "p95": ms(percentile(ordered, 0.95)),
+            "p99": ms(percentile(ordered, 0.99)),
+            "mean": ms(sum(ordered) / len(ordered)) if ordered else None,
+            "max": ms(ordered[-1]) if ordered else None
+        }
+    }
+
+
+async def client_loop(client, state, mix, measure_from, deadline, samples):
+    names, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        name = state.rng.choices(names, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await OPERATIONS[name][1](client, state)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        elapsed = time.perf_counter() - start
+        if start >= measure_from:
+            latencies, errors = samples[name]
+            latencies.append(elapsed)
+            if failed:
+                errors.append(1)
+
+
+async def run_load(base_url, args, mix):
+    state = LoadState(args.seed, args.users, args.prompt_pool)
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    timeout = httpx.Timeout(args.request_timeout)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=timeout) as client:
+        for _ in range(args.seed_tweets):
+            await create_tweet(client, state)
+        if not state.tweet_ids and ({"like_tweet", "comment_tweet"} & set(mix)):
+            raise RuntimeError("Could not seed any tweets to like or comment on")
+
+        samples = {name: ([], []) for name in mix}
+        started = time.perf_counter()
+        measure_from = started + args.warmup
+        deadline = measure_from + args.duration
+        await asyncio.gather(*[
+            client_loop(client, state, mix, measure_from, deadline, samples)
+            for _ in range(args.concurrency)
+        ])
+        # Requests still in flight at the deadline finish late; count the real window
+        duration = max(time.perf_counter() - measure_from, 1e-9)
+
+    endpoints = {}
+    for name, (latencies, errors) in samples.items():
+        endpoints[name] = {"endpoint": OPERATIONS[name][0], **summarize(latencies, len(errors), duration)}
+    all_latencies = [value for latencies, _ in samples.values() for value in latencies]
+    total = summarize(all_latencies, sum(len(errors) for _, errors in samples.values()), duration)
+    return {"duration_s": round(duration, 3), "total": total, "endpoints": endpoints}
+
+
+# --- Local stack ---
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_up(url, process, name):
+    give_up = time.monotonic() + STARTUP_TIMEOUT
+    while time.monotonic() < give_up:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited during startup (code {process.returncode})")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{name} did not come up within {STARTUP_TIMEOUT}s")
+
+
+@contextmanager
+def local_stack(args):
+    """Run the upstream stub and run_server in a scratch directory; yield (server URL, stub URL, server process)."""
+    with tempfile.TemporaryDirectory(prefix="littlex-load-") as scratch:
+        stub_port, server_port = free_port(), free_port()
+        log = open(Path(scratch) / "server.log", "w")
+        stub = subprocess.Popen(
+            [sys.executable, str(BASE_DIR / "benchmarks" / "upstream_stub.py"), "--port", str(stub_port),
+             "--latency-ms", str(args.upstream_latency_ms), "--jitter-ms", str(args.upstream_jitter_ms)],
+            stdout=log, stderr=subprocess.STDOUT
+        )
+        env = dict(
+            os.environ,
+            DEEPSEEK_API_KEY="load-test", OPENAI_API_KEY="load-test",
+            DEEPSEEK_API_BASE=f"http://127.0.0.1:{stub_port}",
+            OPENAI_API_BASE=f"http://127.0.0.1:{stub_port}/v1",
+            STORAGE_BACKEND=args.storage, STORAGE_DIR=str(Path(scratch) / "data"),
+            MEDIA_DIR=str(Path(scratch) / "media")
+        )
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "run_server:app", "--host", "127.0.0.1",
+             "--port", str(server_port), "--workers", str(args.workers), "--log-level", "warning", "--no-access-log"],
+            cwd=BASE_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+        )
+        try:
+            wait_until_up(f"http://127.0.0.1:{stub_port}/stats", stub, "upstream stub")
+            wait_until_up(f"http://127.0.0.1:{server_port}/health", server, "run_server")
+            yield f"http://127.0.0.1:{server_port}", f"http://127.0.0.1:{stub_port}", server
+        except RuntimeError:
+            log.flush()
+            print((Path(scratch) / "server.log").read_text()[-4000:], file=sys.stderr)
+            raise
+        finally:
+            for process in (server, stub):
+                process.terminate()
+            for process in (server, stub):
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            log.close()
+
+
+# --- Reporting ---
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(result):
+    print(f"{'endpoint':<16} {'reqs':>7} {'errs':>5} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for name, row in rows:
+        latency = row["latency_ms"]
+        cells = [latency[key] if latency[key] is not None else float("nan") for key in ("p50", "p95", "p99")]
+        print(f"{name:<16} {row['requests']:>7} {row['errors']:>5} {row['throughput_rps']:>8.1f} "
+              f"{cells[0]:>8.1f} {cells[1]:>8.1f} {cells[2]:>8.1f}")
+
+
+def print_comparison(baseline, result):
+    """Print the relative change of throughput and p50/p95/p99 against a baseline run."""
+    print(f"\nvs. {baseline.get('revision')} ({baseline.get('started_at')}); negative latency change is better")
+    print(f"{'endpoint':<16} {'req/s':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+
+    def change(new, old):
+        if not new or not old:
+            return "     n/a"
+        return f"{(new - old) / old:>+8.1%}"
+
+    rows = list(result["endpoints"].items()) + [("total", result["total"])]
+    for name, row in rows:
+        old = baseline["total"] if name == "total" else baseline["endpoints"].get(name)
+        if old is None:
+            continue
+        print(f"{name:<16} {change(row['throughput_rps'], old['throughput_rps'])} "
+              + " ".join(change(row["latency_ms"][key], old["latency_ms"][key]) for key in ("p50", "p95", "p99")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, default=32, help="concurrent clients")
+    parser.add_argument("--duration", type=float, default=30, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=5, help="unmeasured seconds before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="weighted operations, op=weight,...")
+    parser.add_argument("--upstream-latency-ms", type=float, default=300.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=100.0)
+    parser.add_argument("--prompt-pool", type=int, default=1000,
+                        help="distinct assistant inputs; smaller means more LLM cache hits")
+    parser.add_argument("--seed-tweets", type=int, default=200)
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--request-timeout", type=float, default=60)
+    parser.add_argument("--storage", default="log", help="STORAGE_BACKEND of the local server")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="uvicorn workers of the local server (more than one needs --storage sqlite)")
+    parser.add_argument("--target", help="base URL of a running server; skips the local stack")
+    parser.add_argument("--output", type=Path, help="result JSON path")
+    parser.add_argument("--compare", type=Path, help="earlier result JSON to compare against")
+    args = parser.parse_args()
+
+    try:
+        mix = parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    started_at = datetime.now(timezone.utc)
+    if args.target:
+        result = asyncio.run(run_load(args.target.rstrip("/"), args, mix))
+        upstream_calls = None
+    else:
+        with local_stack(args) as (base_url, stub_url, _):
+            result = asyncio.run(run_load(base_url, args, mix))
+            upstream_calls = httpx.get(f"{stub_url}/stats").json()["calls"]
+
+    result = {
+        "revision": git_revision(),
+        "started_at": started_at.isoformat(),
+        "environment": {"python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count()},
+        "config": {
+            "target": args.target, "concurrency": args.concurrency, "duration_s": args.duration,
+            "warmup_s": args.warmup, "mix": mix, "upstream_latency_ms": args.upstream_latency_ms,
+            "upstream_jitter_ms": args.upstream_jitter_ms, "prompt_pool": args.prompt_pool,
+            "seed_tweets": args.seed_tweets, "users": args.users, "seed": args.seed, "storage": args.storage,
+            "workers": args.workers
+        },
+        "upstream_calls": upstream_calls,
+        **result
+    }
+
+    print_report(result)
+    if args.compare:
+        print_comparison(json.loads(args.compare.read_text()), result)
+
+    output = args.output or RESULTS_DIR / f"load-{started_at:%Y%m%dT%H%M%S}-{result['revision'] or 'unknown'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(result, indent=2) + "\n")
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,214 @@
+"""
+Load test: idle /events/feed (Server-Sent Events) connections held per worker.
+
+Starts the same local stack as ``load_test.py`` (or uses ``--target``),
+opens ``--connections`` event streams, holds them idle for ``--hold``
+seconds, then posts ``--tweets`` tweets and checks that every connection
+receives every ``tweet`` delta. Reports how fast the connections opened,
+server memory per connection and the fan-out latency from the create
+request being sent to each subscriber receiving the event.
+
+Usage:
+    python benchmarks/sse_idle_test.py [--connections N] [--hold S] [--tweets N] [--workers N]
+        [--storage NAME] [--target URL] [--output PATH]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from urllib.parse import urlsplit
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from load_test import local_stack, percentile  # noqa: E402
+
+EVENT_MARKER = b"event: tweet\n"
+CONNECT_BATCH = 200
+
+
+class IdleClient:
+    """One raw-socket SSE subscriber that only timestamps ``tweet`` events."""
+
+    def __init__(self):
+        self.reader = None
+        self.writer = None
+        self.received = []
+        self.closed = False
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(
+            f"GET /events/feed HTTP/1.1\r\nHost: {host}:{port}\r\nAccept: text/event-stream\r\n\r\n".encode()
+        )
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        if not head.startswith(b"HTTP/1.1 200"):
+            raise ConnectionError(head.split(b"\r\n", 1)[0].decode(errors="replace"))
+
+    async def listen(self):
+        tail = b""
+        try:
+            while True:
+                data = await self.reader.read(65536)
+                if not data:
+                    break
+                now = time.perf_counter()
+                window = tail + data
+                self.received.extend([now] * window.count(EVENT_MARKER))
+                tail = window[-(len(EVENT_MARKER) - 1):]
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self.closed = True
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def tree_rss(pid):
+    """Resident memory, in bytes, of a process and its children (Linux /proc)."""
+    total = 0
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+            ppid = int(stat.rsplit(")", 1)[1].split()[1])
+            if int(entry.name) != pid and ppid != pid:
+                continue
+            for line in (entry / "status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            continue
+    return total
+
+
+def raise_fd_limit(needed):
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < needed:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+    return resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+
+
+async def run_idle(base_url, server, args):
+    url = urlsplit(base_url)
+    rss_before = tree_rss(server.pid) if server is not None else None
+
+    clients = [IdleClient() for _ in range(args.connections)]
+    failures = 0
+    start = time.perf_counter()
+    for batch_start in range(0, len(clients), CONNECT_BATCH):
+        batch = clients[batch_start:batch_start + CONNECT_BATCH]
+        results = await asyncio.gather(*[c.connect(url.hostname, url.port) for c in batch], return_exceptions=True)
+        failures += sum(isinstance(r, Exception) for r in results)
+    connect_seconds = time.perf_counter() - start
+    connected = [c for c in clients if c.writer is not None and c.reader is not None]
+    listeners = [asyncio.create_task(c.listen()) for c in connected]
+
+    await asyncio.sleep(args.hold)
+    rss_after = tree_rss(server.pid) if server is not None else None
+    alive = sum(not c.closed for c in connected)
+
+    latencies = []
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as http:
+        for i in range(args.tweets):
+            expected = i + 1
+            # The delta is broadcast inside the handler, before its response arrives
+            sent = time.perf_counter()
+            response = await http.post("/walker/create_tweet", json={"content": f"sse test {i}", "username": "sse"})
+            response.raise_for_status()
+            give_up = sent + args.delivery_timeout
+            while time.perf_counter() < give_up and any(len(c.received) < expected for c in connected if not c.closed):
+                await asyncio.sleep(0.005)
+            latencies.extend(c.received[i] - sent for c in connected if len(c.received) >= expected)
+        metrics = (await http.get("/metrics")).text
+
+    server_connections = next(
+        (float(line.split()[-1]) for line in metrics.splitlines() if line.startswith("littlex_sse_connections ")), None
+    )
+    for c in connected:
+        c.close()
+    for task in listeners:
+        task.cancel()
+    await asyncio.gather(*listeners, return_exceptions=True)
+
+    ordered = sorted(latencies)
+    delivered = len(latencies)
+    expected_total = len(connected) * args.tweets
+    ms = lambda seconds: round(seconds * 1000, 2) if seconds is not None else None
+    return {
+        "connections": {
+            "requested": args.connections,
+            "opened": len(connected),
+            "failed": failures,
+            "alive_after_hold": alive,
+            "server_reported": server_connections,
+            "open_seconds": round(connect_seconds, 3),
+            "opened_per_second": round(len(connected) / connect_seconds, 1) if connect_seconds else None
+        },
+        "memory": {
+            "server_rss_before_mb": round(rss_before / 2**20, 1) if rss_before else None,
+            "server_rss_after_mb": round(rss_after / 2**20, 1) if rss_after else None,
+            "kb_per_connection": round((rss_after - rss_before) / 1024 / max(len(connected), 1), 2)
+            if rss_before else None
+        },
+        "fanout": {
+            "events": args.tweets,
+            "delivered": delivered,
+            "expected": expected_total,
+            "latency_ms": {
+                "p50": ms(percentile(ordered, 0.50)),
+                "p95": ms(percentile(ordered, 0.95)),
+                "p99": ms(percentile(ordered, 0.99)),
+                "max": ms(ordered[-1]) if ordered else None
+            }
+        }
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--connections", type=int, default=5000)
+    parser.add_argument("--hold", type=float, default=10, help="seconds to hold the connections idle")
+    parser.add_argument("--tweets", type=int, default=5, help="tweets to broadcast after the hold")
+    parser.add_argument("--delivery-timeout", type=float, default=10)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--storage", default="memory", help="STORAGE_BACKEND of the local server")
+    parser.add_argument("--target", help="base URL of a running server; skips the local stack")
+    parser.add_argument("--output", type=Path, help="write the result JSON here as well")
+    args = parser.parse_args()
+
+    # One descriptor per connection here, and one more in the server, which inherits the limit
+    limit = raise_fd_limit(args.connections + 256)
+    if limit < args.connections + 64:
+        parser.error(f"open file limit {limit} is too low for {args.connections} connections")
+
+    if args.target:
+        result = asyncio.run(run_idle(args.target.rstrip("/"), None, args))
+    else:
+        stack_args = SimpleNamespace(
+            storage=args.storage, workers=args.workers, upstream_latency_ms=0, upstream_jitter_ms=0
+        )
+        with local_stack(stack_args) as (base_url, _, server):
+            result = asyncio.run(run_idle(base_url, server, args))
+
+    result = {"config": {"workers": args.workers, "hold_s": args.hold, "cpus": os.cpu_count()}, **result}
+    text = json.dumps(result, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
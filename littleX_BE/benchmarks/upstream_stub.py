@@ -0,0 +1,75 @@
+"""
+Stand-in for the DeepSeek and OpenAI chat completion APIs, for load tests.
+
+Answers ``POST /chat/completions`` and ``POST /v1/chat/completions`` after a
+configurable delay, with just enough of the response shape for run_server.py
+to parse: a JSON array when the prompt asks for one, a JSON object for image
+analysis and a short sentence otherwise.
+
+Usage:
+    python benchmarks/upstream_stub.py [--port N] [--latency-ms MS] [--jitter-ms MS]
+
+Point the server at it with DEEPSEEK_API_BASE=http://127.0.0.1:<port> and
+OPENAI_API_BASE=http://127.0.0.1:<port>/v1 (plus any non-empty API keys).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+
+import uvicorn
+from fastapi import Body, FastAPI
+
+# Simulated upstream latency
+STUB_LATENCY_MS = float(os.getenv("STUB_LATENCY_MS", "300"))
+STUB_JITTER_MS = float(os.getenv("STUB_JITTER_MS", "100"))
+
+app = FastAPI(title="littleX upstream stub")
+app.state.calls = 0
+
+
+def completion_text(payload):
+    """Pick a plausible reply for the last user message."""
+    content = payload["messages"][-1]["content"]
+    if not isinstance(content, str):
+        # Vision request: list of text/image_url parts
+        return json.dumps({"products": [], "places": [], "description": "A stub image."})
+    if "JSON array" in content:
+        return "[]"
+    return f"Stub answer to: {content[:60]}"
+
+
+@app.post("/chat/completions")
+@app.post("/v1/chat/completions")
+async def chat_completions(payload: dict = Body(...)):
+    app.state.calls += 1
+    delay = max(random.gauss(STUB_LATENCY_MS, STUB_JITTER_MS), 0) / 1000
+    await asyncio.sleep(delay)
+    return {
+        "id": f"stub-{app.state.calls}",
+        "object": "chat.completion",
+        "model": payload.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": completion_text(payload)}, "finish_reason": "stop"}]
+    }
+
+
+@app.get("/stats")
+async def stats():
+    return {"calls": app.state.calls, "latency_ms": STUB_LATENCY_MS, "jitter_ms": STUB_JITTER_MS}
+
+
+def main():
+    global STUB_LATENCY_MS, STUB_JITTER_MS
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=STUB_LATENCY_MS)
+    parser.add_argument("--jitter-ms", type=float, default=STUB_JITTER_MS)
+    args = parser.parse_args()
+    STUB_LATENCY_MS, STUB_JITTER_MS = args.latency_ms, args.jitter_ms
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning", access_log=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Fixed-dimension tweet embeddings.
+
+Embeddings come from feature hashing, so every tweet lands in the same
+``EMBEDDING_DIM``-dimensional space without a fitted vocabulary and vectors
+stay comparable across tweets. They are stored sparse as one compact byte
+buffer: ``nnz`` int32 column indices followed by ``nnz`` float32 weights.
+"""
+
+import os
+
+import numpy
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# Embedding configuration
+EMBEDDING_DIM = int(os.getenv("EMBEDDING_DIM", "1024"))
+
+_hasher = HashingVectorizer(n_features=EMBEDDING_DIM, alternate_sign=False, norm="l2")
+
+
+def embed(text):
+    """Embed ``text`` as a sparse, l2-normalized float32 buffer."""
+    row = _hasher.transform([text])
+    indices = row.indices.astype(numpy.int32)
+    values = row.data.astype(numpy.float32)
+    order = numpy.argsort(indices)
+    return indices[order].tobytes() + values[order].tobytes()
+
+
+def decode(buffer):
+    """Split an embedding buffer into (indices, values) arrays."""
+    nnz = len(buffer) // 8
+    indices = numpy.frombuffer(buffer, dtype=numpy.int32, count=nnz)
+    values = numpy.frombuffer(buffer, dtype=numpy.float32, count=nnz, offset=nnz * 4)
+    return indices, values
+
+
+def to_dense(buffer):
+    """Expand an embedding buffer to a dense ``EMBEDDING_DIM`` float32 array."""
+    dense = numpy.zeros(EMBEDDING_DIM, dtype=numpy.float32)
+    indices, values = decode(buffer)
+    dense[indices] = values
+    return dense
+
+
+def similarity(a, b):
+    """Cosine similarity of two embedding buffers."""
+    a_indices, a_values = decode(a)
+    b_indices, b_values = decode(b)
+    _, a_pos, b_pos = numpy.intersect1d(a_indices, b_indices, assume_unique=True, return_indices=True)
+    return float(numpy.dot(a_values[a_pos], b_values[b_pos]))
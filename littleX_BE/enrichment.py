@@ -0,0 +1,96 @@
+"""
+Background enrichment of new tweets.
+
+New tweets are queued right after they are created and a small pool of
+asyncio workers computes their AI annotations (summary, articles, products,
+places) once, so the assistant endpoints can serve them without waiting on
+the LLM.
+"""
+
+import asyncio
+import logging
+import os
+
+log = logging.getLogger("littlex.enrichment")
+
+# Enrichment configuration
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "4"))
+ENRICH_QUEUE_SIZE = int(os.getenv("ENRICH_QUEUE_SIZE", "1000"))
+ENRICH_ENQUEUE_TIMEOUT = float(os.getenv("ENRICH_ENQUEUE_TIMEOUT", "0.05"))
+
+
+class EnrichmentPipeline:
+    """
+    Bounded queue of tweets waiting to be enriched, drained by worker tasks.
+
+    When the queue is full ``submit`` waits at most ``enqueue_timeout`` for a
+    slot and then gives up, so a burst of posts slows ``create_tweet`` down
+    only slightly instead of piling up unbounded work. Tweets that are
+    dropped or not yet processed are simply enriched on demand later.
+    """
+
+    def __init__(self, enrich, workers=ENRICH_WORKERS, queue_size=ENRICH_QUEUE_SIZE,
+                 enqueue_timeout=ENRICH_ENQUEUE_TIMEOUT):
+        self.enrich = enrich
+        self.workers = workers
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self._queue = None
+        self._tasks = []
+        self.enriched = 0
+        self.failed = 0
+        self.dropped = 0
+
+    async def start(self):
+        """Create the queue and start the worker tasks."""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"enrichment-{i}")
+            for i in range(self.workers)
+        ]
+
+    async def stop(self):
+        """Cancel the workers; queued tweets stay unenriched."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(self, tweet_id):
+        """
+        Queue a tweet for enrichment.
+
+        Returns:
+            bool: False if the pipeline is stopped or stayed full past the timeout
+        """
+        if self._queue is None:
+            return False
+        try:
+            await asyncio.wait_for(self._queue.put(tweet_id), self.enqueue_timeout)
+            return True
+        except asyncio.TimeoutError:
+            self.dropped += 1
+            return False
+
+    def stats(self):
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "enriched": self.enriched,
+            "failed": self.failed,
+            "dropped": self.dropped
+        }
+
+    async def _worker(self):
+        while True:
+            tweet_id = await self._queue.get()
+            try:
+                await self.enrich(tweet_id)
+                self.enriched += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                log.warning("Error enriching tweet %s: %s", tweet_id, e)
+            finally:
+                self._queue.task_done()
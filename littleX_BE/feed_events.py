@@ -0,0 +1,187 @@
+"""
+Server-Sent Events push channel for feed deltas.
+
+Every change record the tweet store applies, whether from this worker's own
+requests or from another worker through the shared store's change feed, is
+turned into a compact delta and broadcast to every ``/events/feed``
+subscriber. A client loads the feed once, then applies the deltas instead of
+polling ``load_feed``.
+
+Each delta is serialized once per broadcast, not once per subscriber. Every
+connection has a bounded buffer: a subscriber whose unsent events exceed
+``SSE_BUFFER_BYTES``, or whose oldest unsent event has waited more than
+``SSE_MAX_LAG`` seconds, is evicted with a final ``evicted`` event, and
+should reconnect and reload the feed rather than hold memory on the server.
+A burst of records applied in one go (a change feed catch-up) only fills
+the buffers; it evicts no one who keeps reading.
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+
+from tweet_store import comment_key, comment_view, tweet_view
+
+# SSE configuration
+SSE_BUFFER_BYTES = int(os.getenv("SSE_BUFFER_BYTES", str(1024 * 1024)))
+SSE_MAX_LAG = float(os.getenv("SSE_MAX_LAG", "30"))
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "10000"))
+SSE_HEARTBEAT = float(os.getenv("SSE_HEARTBEAT", "15"))
+SSE_RETRY_MS = int(os.getenv("SSE_RETRY_MS", "3000"))
+
+
+def feed_delta(record, tweet):
+    """
+    Map an applied change record to the delta clients see.
+
+    Returns:
+        tuple: (event type, payload), or None for records clients don't need
+    """
+    op = record["op"]
+    if op == "tweet":
+        return "tweet", tweet_view(tweet)
+    if op in ("like", "unlike"):
+        return "likes", {
+            "tweet_id": tweet.id,
+            "username": record["username"],
+            "liked": op == "like",
+            "like_count": tweet.like_count
+        }
+    if op == "comment":
+        comment = tweet.comments.get(comment_key(record["comment"]["id"]))
+        return "comment", {"tweet_id": tweet.id, "comment": comment_view(comment)}
+    if op == "uncomment":
+        return "uncomment", {"tweet_id": tweet.id, "comment_id": record["comment_id"]}
+    return None
+
+
+class Subscription:
+    """One SSE connection's bounded buffer of serialized events."""
+
+    __slots__ = ("buffer", "ready", "evicted", "pending_bytes", "waiting_since")
+
+    def __init__(self):
+        self.buffer = deque()
+        self.ready = asyncio.Event()
+        self.evicted = False
+        self.pending_bytes = 0
+        # When the oldest unsent event was buffered; None while the buffer is empty
+        self.waiting_since = None
+
+    def push(self, message, now):
+        if not self.buffer:
+            self.waiting_since = now
+        self.buffer.append(message)
+        self.pending_bytes += len(message)
+        self.ready.set()
+
+    async def next(self, timeout):
+        """
+        Wait for buffered events.
+
+        Returns:
+            str: Every buffered event joined, or None if ``timeout`` passed first
+        """
+        if not self.buffer:
+            self.ready.clear()
+            try:
+                await asyncio.wait_for(self.ready.wait(), timeout)
+            except asyncio.TimeoutError:
+                return None
+        chunk = "".join(self.buffer)
+        self.buffer.clear()
+        self.pending_bytes = 0
+        self.waiting_since = None
+        return chunk
+
+
+class FeedBroadcaster:
+    """Fan feed deltas out to SSE subscribers, evicting the ones that can't keep up."""
+
+    def __init__(self, buffer_bytes=SSE_BUFFER_BYTES, max_lag=SSE_MAX_LAG, max_connections=SSE_MAX_CONNECTIONS):
+        self.buffer_bytes = buffer_bytes
+        self.max_lag = max_lag
+        self.max_connections = max_connections
+        self._subscribers = set()
+        self._event_id = 0
+        self.published = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """
+        Register a new connection.
+
+        Returns:
+            Subscription: The connection's buffer, or None if the server is full
+        """
+        if len(self._subscribers) >= self.max_connections:
+            return None
+        subscription = Subscription()
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        self._subscribers.discard(subscription)
+
+    def on_change(self, record, tweet):
+        """TweetStore listener: broadcast the delta for an applied record."""
+        if not self._subscribers:
+            return
+        delta = feed_delta(record, tweet)
+        if delta is not None:
+            self.publish(*delta)
+
+    def publish(self, event, payload):
+        """Serialize one event and append it to every subscriber's buffer."""
+        if not self._subscribers:
+            return
+        self._event_id += 1
+        self.published += 1
+        data = json.dumps(payload, separators=(",", ":"))
+        message = f"id: {self._event_id}\nevent: {event}\ndata: {data}\n\n"
+        now = time.monotonic()
+        for subscription in list(self._subscribers):
+            if self._lagging(subscription, len(message), now):
+                self._evict(subscription)
+                continue
+            subscription.push(message, now)
+
+    def _lagging(self, subscription, size, now):
+        """Whether a subscriber stopped draining: too many unsent bytes, or unsent for too long."""
+        if subscription.waiting_since is None:
+            return False
+        return subscription.pending_bytes + size > self.buffer_bytes or now - subscription.waiting_since > self.max_lag
+
+    def _evict(self, subscription):
+        self.evictions += 1
+        self._subscribers.discard(subscription)
+        subscription.evicted = True
+        # Drop the backlog; the client reloads the feed when it reconnects
+        subscription.buffer.clear()
+        subscription.pending_bytes = 0
+        subscription.push('event: evicted\ndata: {"reason":"slow consumer"}\n\n', time.monotonic())
+
+    async def stream(self, subscription, heartbeat=SSE_HEARTBEAT):
+        """Yield the SSE body for one connection until it is evicted or closed."""
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            while True:
+                chunk = await subscription.next(heartbeat)
+                # Comment lines keep idle connections alive through proxies
+                yield ": ping\n\n" if chunk is None else chunk
+                if subscription.evicted:
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        return {
+            "connections": len(self._subscribers),
+            "published": self.published,
+            "evictions": self.evictions
+        }
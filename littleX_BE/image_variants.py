@@ -0,0 +1,198 @@
+"""
+Responsive image variants for uploaded media.
+
+After an image is stored, a pool of worker processes renders downscaled
+derivatives of it (``thumb`` and ``medium``, each as WebP and, when Pillow
+supports it, AVIF) so feeds don't ship full-size originals. Resizing and
+encoding are CPU bound, hence processes rather than threads: the uvicorn
+event loop only awaits the results.
+
+Variants are written next to the originals under
+``MEDIA_DIR/variants/<ab>/<sha256>-<size>-<settings>.<format>``. Their names
+derive from the content hash and render settings, so the directory doubles as
+a disk cache: regenerating an image whose variants already exist only checks
+that the files are there.
+"""
+
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from PIL import Image, ImageOps, features
+
+from media_handler import MEDIA_DIR
+
+log = logging.getLogger("littlex.image_variants")
+
+# Variant configuration
+IMAGE_VARIANT_WORKERS = int(os.getenv("IMAGE_VARIANT_WORKERS", str(os.cpu_count() or 1)))
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", "80"))
+
+# Longest edge, in pixels, of each variant
+VARIANT_SIZES = {
+    "thumb": int(os.getenv("IMAGE_THUMB_SIZE", "320")),
+    "medium": int(os.getenv("IMAGE_MEDIUM_SIZE", "1080"))
+}
+VARIANT_FORMATS = ["webp"] + (["avif"] if features.check("avif") else [])
+
+# AVIF's default speed (6) is ~3.5x slower than 8 for a few percent smaller files
+ENCODER_OPTIONS = {"avif": {"speed": int(os.getenv("IMAGE_AVIF_SPEED", "8"))}}
+
+ORIENTATION_TAG = 0x0112
+
+# Refuse decompression bombs before they reach a worker's memory
+Image.MAX_IMAGE_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(50_000_000)))
+
+
+def variant_path(digest, size, fmt, media_dir=MEDIA_DIR, quality=IMAGE_VARIANT_QUALITY):
+    """
+    Disk location of one variant: ``<dir>/variants/<ab>/<digest>-<size>-<settings>.<fmt>``.
+
+    ``settings`` hashes the render parameters, so changing a size or encoder
+    option yields new URLs instead of new bytes behind a cached one.
+    """
+    settings = repr((VARIANT_SIZES[size], quality, ENCODER_OPTIONS.get(fmt)))
+    tag = hashlib.sha256(settings.encode()).hexdigest()[:8]
+    return Path(media_dir) / "variants" / digest[:2] / f"{digest}-{size}-{tag}.{fmt}"
+
+
+def render_variants(source, digest, media_dir=MEDIA_DIR, quality=IMAGE_VARIANT_QUALITY):
+    """
+    Render every missing variant of one image. Runs in a worker process.
+
+    Args:
+        source: Path of the stored original
+        digest: sha256 of the original, used to name the variants
+        media_dir: Media root the variants are written under
+        quality: Encoder quality for lossy formats
+
+    Returns:
+        dict: size -> {"width", "height", format: url}, plus "rendered", the
+        number of files written (0 when every variant was already cached)
+    """
+    targets = {
+        (size, fmt): variant_path(digest, size, fmt, media_dir, quality)
+        for size in VARIANT_SIZES for fmt in VARIANT_FORMATS
+    }
+    rendered = 0
+    variants = {}
+    with Image.open(source) as original:
+        width, height = original.size
+        if original.getexif().get(ORIENTATION_TAG, 1) in (5, 6, 7, 8):
+            width, height = height, width
+        pending = {key: path for key, path in targets.items() if not path.exists()}
+        image = None
+        if pending:
+            original.draft("RGB", (max(VARIANT_SIZES.values()),) * 2)
+            image = ImageOps.exif_transpose(original)
+            if image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+        # Largest first, so each smaller size is resized from the previous one
+        for size, edge in sorted(VARIANT_SIZES.items(), key=lambda item: -item[1]):
+            scale = min(edge / max(width, height), 1.0)
+            variants[size] = {"width": round(width * scale), "height": round(height * scale)}
+            resized = None
+            for fmt in VARIANT_FORMATS:
+                path = targets[(size, fmt)]
+                variants[size][fmt] = f"/media/{path.relative_to(media_dir).as_posix()}"
+                if (size, fmt) not in pending:
+                    continue
+                if resized is None:
+                    image.thumbnail((edge, edge), Image.Resampling.LANCZOS)
+                    resized = image
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+                try:
+                    resized.save(tmp, format=fmt.upper(), quality=quality, **ENCODER_OPTIONS.get(fmt, {}))
+                    os.replace(tmp, path)
+                finally:
+                    tmp.unlink(missing_ok=True)
+                rendered += 1
+
+    variants["rendered"] = rendered
+    return variants
+
+
+class ImageVariantPipeline:
+    """
+    Render variants for each image of a new tweet in a process pool.
+
+    ``submit`` returns immediately; when a render finishes the variant URLs
+    are recorded on the tweet's media entry by awaiting ``on_done``. Media that
+    Pillow can't decode are skipped and keep serving the original.
+    """
+
+    def __init__(self, on_done, workers=IMAGE_VARIANT_WORKERS, media_dir=MEDIA_DIR):
+        self.on_done = on_done
+        self.workers = workers
+        self.media_dir = media_dir
+        self._pool = None
+        self._tasks = set()
+        self.rendered = 0
+        self.cached = 0
+        self.failed = 0
+
+    def start(self):
+        """Start the worker processes."""
+        # Spawned, not forked: the server process already runs threads
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers, mp_context=multiprocessing.get_context("spawn")
+        )
+
+    async def stop(self):
+        """Wait for running renders, then shut the pool down."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+            self._pool = None
+
+    def submit(self, tweet_id, media):
+        """
+        Schedule variant rendering for the images in a tweet's media list.
+
+        Returns:
+            int: Number of images scheduled
+        """
+        if self._pool is None:
+            return 0
+        scheduled = 0
+        for item in media:
+            if not isinstance(item, dict) or not item.get("content_type", "").startswith("image/"):
+                continue
+            task = asyncio.create_task(self._render(tweet_id, item))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+            scheduled += 1
+        return scheduled
+
+    def stats(self):
+        return {
+            "workers": self.workers,
+            "pending": len(self._tasks),
+            "rendered": self.rendered,
+            "cached": self.cached,
+            "failed": self.failed
+        }
+
+    async def _render(self, tweet_id, item):
+        source = Path(self.media_dir) / Path(item["url"]).relative_to("/media")
+        loop = asyncio.get_running_loop()
+        try:
+            variants = await loop.run_in_executor(
+                self._pool, render_variants, str(source), item["id"], self.media_dir
+            )
+        except Exception as e:
+            self.failed += 1
+            log.warning("Error rendering variants for %s: %s", item["id"], e)
+            return
+        if variants.pop("rendered"):
+            self.rendered += 1
+        else:
+            self.cached += 1
+        await self.on_done(tweet_id, item["id"], variants)
@@ -0,0 +1,86 @@
+"""
+Single-pass keyword detection for the assistant's product/place fallback.
+
+The dictionary is indexed once at import into hash tables keyed by word,
+plus the multi-word phrases that start with each word. A text is tokenized
+in a single pass and intersected with that vocabulary in C, so the cost no
+longer grows with the number of keywords, and matching is by whole words:
+"la" no longer hits "lake".
+"""
+
+import json
+import os
+import re
+from pathlib import Path
+
+# Dictionary configuration
+KEYWORDS_FILE = os.getenv("KEYWORDS_FILE", str(Path(__file__).parent / "keywords.json"))
+
+_WORD = re.compile(r"\w+")
+
+
+class KeywordMatcher:
+    """
+    Match every keyword of a ``{category: [keywords]}`` dictionary in one pass.
+
+    A keyword may belong to several categories (e.g. "mall" is both a
+    product and a place).
+    """
+
+    def __init__(self, dictionary):
+        self.categories = {}
+        for category, keywords in dictionary.items():
+            for keyword in keywords:
+                keyword = " ".join(_WORD.findall(keyword.lower()))
+                if keyword:
+                    self.categories.setdefault(keyword, []).append(category)
+
+        # first word -> multi-word phrases starting with it, longest first
+        self.phrases = {}
+        for keyword in sorted(self.categories, key=len, reverse=True):
+            words = tuple(keyword.split())
+            if len(words) > 1:
+                self.phrases.setdefault(words[0], []).append((words, keyword))
+        self.vocabulary = frozenset(w for w in self.categories if " " not in w) | frozenset(self.phrases)
+
+    @classmethod
+    def from_file(cls, path=KEYWORDS_FILE):
+        """Build a matcher from a JSON ``{category: [keywords]}`` file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text):
+        """
+        Find the keywords present in ``text``.
+
+        Returns:
+            dict: category -> keywords found, each once, in order of appearance
+        """
+        found = {}
+        words = _WORD.findall(text.lower())
+        present = self.vocabulary.intersection(words)
+        if not present:
+            return found
+
+        hits = []
+        for word in present:
+            if word in self.categories:
+                hits.append((words.index(word), word))
+            for phrase, keyword in self.phrases.get(word, ()):
+                start = words.index(word)
+                while start >= 0:
+                    if tuple(words[start:start + len(phrase)]) == phrase:
+                        hits.append((start, keyword))
+                        break
+                    try:
+                        start = words.index(word, start + 1)
+                    except ValueError:
+                        start = -1
+
+        for _, keyword in sorted(hits):
+            for category in self.categories[keyword]:
+                found.setdefault(category, []).append(keyword)
+        return found
+
+
+keyword_matcher = KeywordMatcher.from_file()
@@ -0,0 +1,170 @@
+"""
+Content-addressed cache for LLM responses.
+
+Responses are keyed by a hash of everything that determines them (model,
+system message, prompt, temperature), kept in an in-process LRU with a TTL
+and optionally mirrored to disk so they survive restarts.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+log = logging.getLogger("littlex.llm_cache")
+
+# Cache configuration
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "2048"))
+LLM_CACHE_TTL = float(os.getenv("LLM_CACHE_TTL", "3600"))
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "")
+
+# Placeholder answers the server returns instead of a real completion
+UNCACHEABLE_PREFIXES = ("[Error]", "[Mock Response]")
+
+_MISSING = object()
+
+
+def cache_key(model, system_message, prompt, temperature):
+    """Hash the inputs that determine an LLM response."""
+    raw = json.dumps([model, system_message, prompt, temperature], ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cacheable_response(response):
+    """Whether an LLM response is a real completion worth caching."""
+    return isinstance(response, str) and not response.startswith(UNCACHEABLE_PREFIXES)
+
+
+class LLMCache:
+    """
+    LRU + TTL response cache with single-flight deduplication.
+
+    Concurrent lookups for a key that is already being fetched wait on the
+    same upstream call instead of issuing their own. The shared call is
+    shielded, so one caller timing out does not cancel it for the others.
+    """
+
+    def __init__(self, max_entries=LLM_CACHE_SIZE, ttl=LLM_CACHE_TTL, disk_dir=LLM_CACHE_DIR):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    async def get_or_call(self, key, call, cacheable=None):
+        """
+        Return the cached value for ``key`` or compute it with ``call``.
+
+        Args:
+            key: Cache key, usually from :func:`cache_key`
+            call: Zero-argument coroutine function producing the value
+            cacheable: Optional predicate; values it rejects are returned
+                but not stored (e.g. upstream error strings)
+
+        Returns:
+            The cached or freshly computed value
+        """
+        value = self._get(key)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(self._load(key, call, cacheable))
+        self._inflight[key] = task
+        task.add_done_callback(lambda t: self._finish(key, t))
+        return await asyncio.shield(task)
+
+    def stats(self):
+        """Return hit/miss counters and current size."""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "max_entries": self.max_entries
+        }
+
+    def clear(self):
+        self._entries.clear()
+
+    async def _load(self, key, call, cacheable):
+        if self.disk_dir is not None:
+            value = await asyncio.to_thread(self._read_disk, key)
+            if value is not _MISSING:
+                self.disk_hits += 1
+                self._put(key, value)
+                return value
+
+        self.misses += 1
+        value = await call()
+        if cacheable is None or cacheable(value):
+            self._put(key, value)
+            if self.disk_dir is not None:
+                asyncio.get_running_loop().run_in_executor(None, self._write_disk, key, value)
+        return value
+
+    def _finish(self, key, task):
+        self._inflight.pop(key, None)
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter gave up
+            task.exception()
+
+    def _get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _put(self, key, value):
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def _disk_path(self, key):
+        return self.disk_dir / key[:2] / f"{key}.json"
+
+    def _read_disk(self, key):
+        try:
+            with open(self._disk_path(key), encoding="utf-8") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING
+        if entry.get("expires_at", 0) < time.time():
+            return _MISSING
+        return entry["value"]
+
+    def _write_disk(self, key, value):
+        path = self._disk_path(key)
+        try:
+            path.parent.mkdir(exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump({"expires_at": time.time() + self.ttl, "value": value}, f)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.error("Error writing LLM cache entry: %s", e)
@@ -1,16 +1,461 @@
 """
 Media handler for processing multipart form data and managing media files.
+
+Uploads are parsed as the request body streams in: each file part is written
+to a temporary file chunk by chunk (in a worker thread, off the event loop)
+while its sha256 is computed, then moved to its content address under
+``MEDIA_DIR``. Identical files are stored once. Only images and videos are
+accepted, recognized by their leading bytes; the stored extension and
+content type come from that, never from the client.
 """
 
+import asyncio
+import hashlib
+import logging
 import os
-from pathlib import Path
+import re
+import stat
+import tempfile
+from pathlib import Path, PurePosixPath
+
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, JSONResponse, Response
+
+try:
+    from python_multipart.multipart import MultipartParser, parse_options_header
+except ImportError:  # python-multipart < 0.0.13
+    from multipart.multipart import MultipartParser, parse_options_header
+
+log = logging.getLogger("littlex.media")
 
 # Media directory configuration
 MEDIA_DIR = os.getenv("MEDIA_DIR", "media")
+MEDIA_MAX_FILE_SIZE = int(os.getenv("MEDIA_MAX_FILE_SIZE", str(10 * 1024 * 1024)))
+MEDIA_MAX_FILES = int(os.getenv("MEDIA_MAX_FILES", "4"))
+MEDIA_MAX_FIELD_SIZE = int(os.getenv("MEDIA_MAX_FIELD_SIZE", str(64 * 1024)))
+MEDIA_WRITE_BUFFER = int(os.getenv("MEDIA_WRITE_BUFFER", str(256 * 1024)))
+
+# Whole-request cap: every file at its limit plus room for the text fields
+MEDIA_MAX_REQUEST_SIZE = MEDIA_MAX_FILES * MEDIA_MAX_FILE_SIZE + 4 * MEDIA_MAX_FIELD_SIZE
 
 # Ensure media directory exists
 Path(MEDIA_DIR).mkdir(exist_ok=True)
 
+# Extension -> content type of everything uploads and variants are stored as
+MEDIA_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".avif": "image/avif",
+    ".heic": "image/heic",
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+    ".webm": "video/webm"
+}
+# Enough leading bytes to recognize every type above
+SNIFF_BYTES = 16
+# ISO base media (ftyp) major brands that aren't plain MP4
+_ISO_BRANDS = {b"avif": ".avif", b"avis": ".avif", b"heic": ".heic", b"heix": ".heic", b"qt  ": ".mov"}
+
+# Stored names start with the content's sha256, so their bytes never change
+_CONTENT_ADDRESSED = re.compile(r"^[0-9a-f]{64}(?:-[a-z0-9-]+)?(?:\.[a-z0-9]{1,10})?$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Sent with every media response: browsers must use our content type, never guess one
+SAFE_MEDIA_HEADERS = {"X-Content-Type-Options": "nosniff"}
+
+
+class UploadError(ValueError):
+    """Malformed or disallowed upload (HTTP 400)."""
+
+
+class UploadTooLarge(UploadError):
+    """Upload exceeds a configured size or count limit (HTTP 413)."""
+
+
+def media_path(digest, extension, media_dir=MEDIA_DIR):
+    """Content-addressed location of a stored file: ``<dir>/<ab>/<digest><ext>``."""
+    return Path(media_dir) / digest[:2] / f"{digest}{extension}"
+
+
+def sniff_media_type(head):
+    """
+    Recognize an image or video from its first ``SNIFF_BYTES`` bytes.
+
+    Returns:
+        str: The extension to store it under (a ``MEDIA_TYPES`` key), or None
+    """
+    if head.startswith(b"\xff\xd8\xff"):
+        return ".jpg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return ".png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return ".gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return ".webp"
+    if head[:4] == b"\x1a\x45\xdf\xa3":
+        return ".webm"
+    if head[4:8] == b"ftyp":
+        return _ISO_BRANDS.get(head[8:12], ".mp4")
+    return None
+
+
+class _FilePart:
+    """A file part being written to a temporary file while it is hashed."""
+
+    def __init__(self, field, filename, media_dir):
+        self.field = field
+        self.filename = filename
+        self.media_dir = media_dir
+        self.size = 0
+        self.digest = hashlib.sha256()
+        self.buffer = bytearray()
+        self.head = bytearray()
+        self.extension = None
+        self.file = None
+
+    def open(self):
+        tmp_dir = Path(self.media_dir) / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        self.file = tempfile.NamedTemporaryFile(dir=tmp_dir, delete=False)
+
+    def write(self, data):
+        self.digest.update(data)
+        self.file.write(data)
+
+    def identify(self):
+        """
+        Settle the stored extension from the leading bytes.
+
+        Raises:
+            UploadError: If the file is not a supported image or video
+        """
+        self.extension = sniff_media_type(bytes(self.head))
+        if self.extension is None:
+            raise UploadError(f"File '{self.filename}' is not a supported image or video")
+
+    def finish(self):
+        """Move the temporary file to its content address, deduplicating."""
+        self.file.close()
+        digest = self.digest.hexdigest()
+        target = media_path(digest, self.extension, self.media_dir)
+        if target.exists():
+            os.unlink(self.file.name)
+        else:
+            target.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(self.file.name, target)
+        return {
+            "id": digest,
+            "url": f"/media/{target.relative_to(self.media_dir).as_posix()}",
+            "filename": self.filename,
+            "content_type": MEDIA_TYPES[self.extension],
+            "size": self.size
+        }
+
+    def discard(self):
+        if self.file is not None:
+            self.file.close()
+            try:
+                os.unlink(self.file.name)
+            except FileNotFoundError:
+                pass
+
+
+class MultipartUpload:
+    """
+    Incremental multipart/form-data receiver.
+
+    Feed it the raw body with ``await feed(chunk)``; text fields are kept in
+    memory and file parts go straight to disk. Limits are checked as bytes
+    arrive, so an oversized upload is rejected without reading the rest.
+    """
+
+    def __init__(self, content_type, media_dir=MEDIA_DIR, max_file_size=MEDIA_MAX_FILE_SIZE,
+                 max_files=MEDIA_MAX_FILES, max_field_size=MEDIA_MAX_FIELD_SIZE):
+        _, params = parse_options_header(content_type)
+        boundary = params.get(b"boundary")
+        if not boundary:
+            raise UploadError("Missing multipart boundary")
+
+        self.media_dir = media_dir
+        self.max_file_size = max_file_size
+        self.max_files = max_files
+        self.max_field_size = max_field_size
+        self.fields = {}
+        self.media = []
+        self._events = []
+        self._headers = {}
+        self._header_field = b""
+        self._header_value = b""
+        self._part = None
+        self._files = 0
+        self._complete = False
+        self._parser = MultipartParser(boundary, {
+            "on_part_begin": self._on_part_begin,
+            "on_header_field": self._on_header_field,
+            "on_header_value": self._on_header_value,
+            "on_header_end": self._on_header_end,
+            "on_headers_finished": self._on_headers_finished,
+            "on_part_data": self._on_part_data,
+            "on_part_end": self._on_part_end,
+            "on_end": self._on_end
+        })
+
+    # Parser callbacks run synchronously inside parser.write(); they only
+    # record events, which feed() then applies with non-blocking I/O.
+
+    def _on_part_begin(self):
+        self._headers = {}
+
+    def _on_header_field(self, data, start, end):
+        self._header_field += data[start:end]
+
+    def _on_header_value(self, data, start, end):
+        self._header_value += data[start:end]
+
+    def _on_header_end(self):
+        self._headers[self._header_field.lower()] = self._header_value
+        self._header_field = b""
+        self._header_value = b""
+
+    def _on_headers_finished(self):
+        self._events.append(("begin", self._headers))
+
+    def _on_part_data(self, data, start, end):
+        self._events.append(("data", data[start:end]))
+
+    def _on_part_end(self):
+        self._events.append(("end", None))
+
+    def _on_end(self):
+        self._complete = True
+
+    async def feed(self, chunk):
+        """Parse the next chunk of the request body."""
+        try:
+            self._parser.write(chunk)
+        except Exception as e:
+            raise UploadError(f"Malformed multipart body: {e}") from e
+        events, self._events = self._events, []
+        for kind, value in events:
+            if kind == "begin":
+                await self._begin(value)
+            elif kind == "data":
+                await self._data(value)
+            else:
+                await self._end()
+
+    async def close(self):
+        """Finish parsing once the body is exhausted."""
+        self._parser.finalize()
+        if not self._complete or self._part is not None:
+            raise UploadError("Truncated multipart body")
+
+    def abort(self):
+        """Remove the temporary file of a part that was never completed."""
+        if isinstance(self._part, _FilePart):
+            self._part.discard()
+        self._part = None
+
+    async def _begin(self, headers):
+        _, options = parse_options_header(headers.get(b"content-disposition", b""))
+        field = options.get(b"name", b"").decode("utf-8", "replace")
+        filename = options.get(b"filename")
+        if filename is None:
+            self._part = (field, bytearray())
+            return
+
+        self._files += 1 if filename else 0
+        if self._files > self.max_files:
+            raise UploadTooLarge(f"At most {self.max_files} files per upload")
+        # The declared content type is ignored; identify() checks the bytes themselves
+        self._part = _FilePart(field, filename.decode("utf-8", "replace"), self.media_dir)
+        await asyncio.to_thread(self._part.open)
+
+    async def _data(self, data):
+        part = self._part
+        if isinstance(part, tuple):
+            if len(part[1]) + len(data) > self.max_field_size:
+                raise UploadTooLarge(f"Field '{part[0]}' exceeds {self.max_field_size} bytes")
+            part[1].extend(data)
+            return
+
+        part.size += len(data)
+        if part.size > self.max_file_size:
+            raise UploadTooLarge(f"File '{part.filename}' exceeds {self.max_file_size} bytes")
+        if part.extension is None and part.filename:
+            part.head.extend(data[:SNIFF_BYTES - len(part.head)])
+            if len(part.head) >= SNIFF_BYTES:
+                # Reject anything else before the rest of it is written
+                part.identify()
+        part.buffer.extend(data)
+        if len(part.buffer) >= MEDIA_WRITE_BUFFER:
+            buffer, part.buffer = bytes(part.buffer), bytearray()
+            await asyncio.to_thread(part.write, buffer)
+
+    async def _end(self):
+        part = self._part
+        if isinstance(part, tuple):
+            self.fields[part[0]] = part[1].decode("utf-8", "replace")
+        else:
+            if part.filename:
+                if part.extension is None:
+                    part.identify()
+                if part.buffer:
+                    await asyncio.to_thread(part.write, bytes(part.buffer))
+                self.media.append(await asyncio.to_thread(part.finish))
+            else:
+                # Empty file input: browsers still send the part
+                await asyncio.to_thread(part.discard)
+        self._part = None
+
+
+async def receive_multipart_create_tweet(request):
+    """
+    Stream a multipart create_tweet request to disk.
+
+    Args:
+        request: Starlette/FastAPI request with a multipart/form-data body
+
+    Returns:
+        dict: Payload with content, username, and the stored media list
+
+    Raises:
+        UploadTooLarge: If the body, a file, or the file count exceeds its limit
+        UploadError: If the body is not valid multipart data
+    """
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > MEDIA_MAX_REQUEST_SIZE:
+        raise UploadTooLarge(f"Upload exceeds {MEDIA_MAX_REQUEST_SIZE} bytes")
+
+    upload = MultipartUpload(request.headers.get("content-type", ""))
+    received = 0
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > MEDIA_MAX_REQUEST_SIZE:
+                raise UploadTooLarge(f"Upload exceeds {MEDIA_MAX_REQUEST_SIZE} bytes")
+            await upload.feed(chunk)
+        await upload.close()
+    except Exception:
+        upload.abort()
+        raise
+
+    return {
+        "content": upload.fields.get("content") or "",
+        "username": upload.fields.get("username") or "anon",
+        "media": upload.media
+    }
+
+
+class MediaFileResponse(FileResponse):
+    """
+    FileResponse that hands whole-file bodies to the server's sendfile.
+
+    Servers advertising the ASGI ``http.response.zerocopysend`` extension get
+    the file descriptor instead of the bytes; everything else (other
+    servers, HEAD, Range requests) goes through FileResponse's own path.
+    """
+
+    async def __call__(self, scope, receive, send):
+        headers = Headers(scope=scope)
+        if (
+            "http.response.zerocopysend" not in scope.get("extensions", {})
+            or scope["method"].upper() == "HEAD"
+            or "range" in headers
+        ):
+            await super().__call__(scope, receive, send)
+            return
+
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        with open(self.path, "rb") as file:
+            await send({"type": "http.response.zerocopysend", "file": file, "more_body": False})
+        if self.background is not None:
+            await self.background()
+
+
+def _resolve_media(media_dir, parts):
+    """
+    Resolve a media path, following symlinks, and stat it.
+
+    Returns:
+        tuple: (resolved path, stat result), or (None, None) if it resolves
+        outside ``media_dir``
+
+    Raises:
+        FileNotFoundError: If the file doesn't exist
+    """
+    root = Path(media_dir).resolve()
+    full_path = root.joinpath(*parts).resolve()
+    if not full_path.is_relative_to(root):
+        return None, None
+    return full_path, os.stat(full_path)
+
+
+def _etag_matches(etag, if_none_match):
+    tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+async def media_response(path, request_headers, media_dir=MEDIA_DIR):
+    """
+    Serve a stored media file with caching headers.
+
+    Content-addressed names get a strong ETag derived from the name and
+    ``Cache-Control: immutable``; a matching ``If-None-Match`` is answered
+    with 304 before the file is even looked up. Any other file still
+    revalidates on every use. Range requests are served by FileResponse.
+
+    Only paths that resolve inside ``media_dir`` are served. Images and
+    videos (``MEDIA_TYPES``) are served inline; anything else, such as a
+    file stored before uploads were type-checked, only as an attachment,
+    and browsers are told not to sniff either.
+
+    Args:
+        path: Path below ``/media/``
+        request_headers: Incoming request headers
+        media_dir: Media root to serve from
+
+    Returns:
+        Response: 200/206 file response, 304, or 404
+    """
+    relative = PurePosixPath(path)
+    parts = relative.parts
+    # "//etc/passwd" or "%2Fetc/passwd" would otherwise join as an absolute path
+    if not parts or relative.is_absolute() or any(part.startswith(".") for part in parts):
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+
+    name = parts[-1]
+    if _CONTENT_ADDRESSED.match(name):
+        etag = f'"{name.split(".")[0]}"'
+        headers = {"ETag": etag, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+        if _etag_matches(etag, request_headers.get("if-none-match", "")):
+            return Response(status_code=304, headers={**headers, **SAFE_MEDIA_HEADERS})
+    else:
+        etag = None
+        headers = {"Cache-Control": "no-cache"}
+    headers.update(SAFE_MEDIA_HEADERS)
+
+    try:
+        full_path, stat_result = await asyncio.to_thread(_resolve_media, media_dir, parts)
+    except (FileNotFoundError, NotADirectoryError):
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+    if full_path is None or not stat.S_ISREG(stat_result.st_mode):
+        return JSONResponse(status_code=404, content={"error": "Not found"})
+
+    media_type = MEDIA_TYPES.get(PurePosixPath(name).suffix.lower())
+    if media_type is not None:
+        response = MediaFileResponse(full_path, stat_result=stat_result, headers=headers, media_type=media_type)
+    else:
+        response = MediaFileResponse(
+            full_path, stat_result=stat_result, headers=headers, media_type="application/octet-stream",
+            filename=name, content_disposition_type="attachment"
+        )
+    if etag is None and _etag_matches(response.headers["etag"], request_headers.get("if-none-match", "")):
+        return Response(status_code=304, headers={"ETag": response.headers["etag"], **headers})
+    return response
+
 
 def process_multipart_create_tweet(form_data):
     """
@@ -38,9 +483,7 @@ def process_multipart_create_tweet(form_data):
         
         return payload
     except Exception as e:
-        print(f"Error processing multipart data: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error processing multipart data")
         return {
             "content": "",
             "username": "anon",
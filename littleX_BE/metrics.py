@@ -0,0 +1,279 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms are plain dicts keyed by label values, so
+recording a sample is a dict lookup and a few additions; buckets are only
+made cumulative when ``/metrics`` is scraped. ``MetricsMiddleware`` times
+every HTTP request by route template and status, and ``LoopLagMonitor``
+samples how late the event loop wakes up from a short sleep.
+
+There is no dependency on prometheus_client; the exposition format is
+text/plain version 0.0.4.
+"""
+
+import asyncio
+import bisect
+import math
+import os
+import time
+
+# Metrics configuration
+METRICS_LOOP_LAG_INTERVAL = float(os.getenv("METRICS_LOOP_LAG_INTERVAL", "0.5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+EVENT_STREAM = b"text/event-stream"
+
+# Seconds; spans fast in-memory handlers up to slow upstream LLM calls
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+LOOP_LAG_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels):
+        return self._values.get(labels, 0)
+
+    def advance_to(self, total, *labels):
+        """Catch up with a monotonic total counted elsewhere (read when scraped)."""
+        if total > self.value(*labels):
+            self._values[labels] = total
+
+    def samples(self):
+        for labels, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """Value that can go up and down, per label combination."""
+
+    kind = "gauge"
+
+    def dec(self, *labels, amount=1):
+        self._values[labels] = self._values.get(labels, 0) - amount
+
+    def set(self, value, *labels):
+        self._values[labels] = value
+
+
+class Histogram:
+    """
+    Bucketed distribution per label combination.
+
+    Each observation increments a single bucket; the cumulative
+    ``le`` counts Prometheus expects are summed at exposition time.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._series = {}
+
+    def observe(self, value, *labels):
+        series = self._series.get(labels)
+        if series is None:
+            series = self._series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        series[bisect.bisect_left(self.buckets, value)] += 1
+        series[-1] += value
+
+    def count(self, *labels):
+        series = self._series.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def samples(self):
+        bounds = self.buckets + (math.inf,)
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(bounds, series):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {_format_value(series[-1])}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Registry:
+    """Collection of metrics rendered together for a scrape."""
+
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self.register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS):
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self):
+        """Return every metric in the Prometheus text exposition format."""
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+http_requests = registry.counter(
+    "littlex_http_requests_total", "HTTP requests by method, route and status.", ("method", "route", "status")
+)
+http_request_duration = registry.histogram(
+    "littlex_http_request_duration_seconds", "HTTP request latency by method, route and status.",
+    ("method", "route", "status")
+)
+http_in_flight = registry.gauge(
+    "littlex_http_requests_in_flight", "HTTP requests currently being served, by method.", ("method",)
+)
+llm_requests = registry.counter(
+    "littlex_llm_requests_total", "Upstream LLM calls by upstream and outcome (ok, error, timeout).",
+    ("upstream", "outcome")
+)
+llm_request_duration = registry.histogram(
+    "littlex_llm_request_duration_seconds", "Upstream LLM call latency by upstream and outcome.",
+    ("upstream", "outcome")
+)
+loop_lag = registry.histogram(
+    "littlex_event_loop_lag_seconds", "How late the event loop woke up from a timed sleep.",
+    buckets=LOOP_LAG_BUCKETS
+)
+loop_lag_last = registry.gauge(
+    "littlex_event_loop_lag_last_seconds", "Most recent event loop lag sample."
+)
+log_records_dropped = registry.counter(
+    "littlex_log_records_dropped_total", "Log records dropped because the log queue was full."
+)
+sse_connections = registry.gauge(
+    "littlex_sse_connections", "Open /events/feed connections."
+)
+sse_evictions = registry.counter(
+    "littlex_sse_evictions_total", "/events/feed connections evicted as slow consumers."
+)
+
+
+def record_llm_call(upstream, outcome, seconds):
+    """Record one upstream LLM call."""
+    llm_requests.inc(upstream, outcome)
+    llm_request_duration.observe(seconds, upstream, outcome)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request.
+
+    Requests are labelled with the route template (``/walker/like_tweet/{tweet_id}``)
+    rather than the raw path, so ids don't explode the series count; requests
+    that match no route are labelled ``unmatched``. Latency runs until the
+    response body is complete, so streamed responses count in full.
+
+    Event streams (``text/event-stream``) stay open for the life of the
+    client, so they leave the in-flight gauge once their headers are sent
+    and are counted without a latency sample.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+        event_stream = False
+        start = time.perf_counter()
+
+        async def send_with_status(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = any(
+                    name == b"content-type" and value.startswith(EVENT_STREAM)
+                    for name, value in message.get("headers", ())
+                )
+                if event_stream:
+                    http_in_flight.dec(method)
+            await send(message)
+
+        http_in_flight.inc(method)
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            labels = (method, route.path if route is not None else "unmatched", status)
+            http_requests.inc(*labels)
+            if not event_stream:
+                http_in_flight.dec(method)
+                http_request_duration.observe(time.perf_counter() - start, *labels)
+
+
+class LoopLagMonitor:
+    """Background task that measures event loop lag every ``interval`` seconds."""
+
+    def __init__(self, interval=METRICS_LOOP_LAG_INTERVAL):
+        self.interval = interval
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - start - self.interval, 0.0)
+            loop_lag.observe(lag)
+            loop_lag_last.set(lag)
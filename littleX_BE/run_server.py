@@ -1,12 +1,13 @@
 import os
 import json
+import asyncio
+import logging
 import base64
-import uuid
 import secrets
 import time
+import contextvars
 from pathlib import Path
 from typing import Optional, List
-from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
 
@@ -14,26 +15,67 @@ from dotenv import load_dotenv
 env_path = Path(__file__).parent / ".env"
 load_dotenv(dotenv_path=env_path)
 
+from structured_logging import setup_logging, dropped_records
+
+# Before anything logs: route littlex.* loggers through the background writer
+setup_logging()
+
 from fastapi import FastAPI, Request, Form, File, UploadFile, HTTPException, Body
-from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
 from fastapi.encoders import jsonable_encoder
 import uvicorn
-import requests
 import httpx  # For async HTTP calls
 
-from media_handler import process_multipart_create_tweet, MEDIA_DIR
+from media_handler import (
+    process_multipart_create_tweet, receive_multipart_create_tweet, media_response,
+    UploadError, UploadTooLarge, MEDIA_DIR
+)
+from tweet_store import TweetStore, comment_view, decode_cursor, tweet_view
+from storage import create_backend, STORAGE_BACKEND
+from llm_cache import LLMCache, cache_key, cacheable_response
+from enrichment import EnrichmentPipeline
+from keyword_matcher import keyword_matcher
+from image_variants import ImageVariantPipeline
+from feed_events import FeedBroadcaster
+from metrics import (
+    MetricsMiddleware, LoopLagMonitor, record_llm_call, registry, log_records_dropped,
+    sse_connections, sse_evictions, CONTENT_TYPE as METRICS_CONTENT_TYPE
+)
+
+log = logging.getLogger("littlex.server")
+# Per-request lines; sampled by LOG_SAMPLE_RATES
+request_log = logging.getLogger("littlex.request")
 
 # Configuration
 PORT = int(os.getenv("PORT", "8000"))
+# Worker processes; more than one needs a shared store (STORAGE_BACKEND=sqlite)
+WORKERS = int(os.getenv("WORKERS", "1"))
 JAC_FILE = "littleX.jac"
+FEED_MAX_LIMIT = int(os.getenv("FEED_MAX_LIMIT", "100"))
+NDJSON_BATCH_SIZE = int(os.getenv("NDJSON_BATCH_SIZE", "200"))
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+# Upstream LLM configuration
+DEEPSEEK_API_BASE = os.getenv("DEEPSEEK_API_BASE", "https://api.deepseek.com")
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "15"))
+LLM_CONNECT_TIMEOUT = float(os.getenv("LLM_CONNECT_TIMEOUT", "5"))
+LLM_POOL_MAX_CONNECTIONS = int(os.getenv("LLM_POOL_MAX_CONNECTIONS", "100"))
+LLM_POOL_MAX_KEEPALIVE = int(os.getenv("LLM_POOL_MAX_KEEPALIVE", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.getenv("LLM_KEEPALIVE_EXPIRY", "30"))
+EXPLAIN_DEADLINE = float(os.getenv("EXPLAIN_DEADLINE", "20"))
+OPENAI_API_BASE = os.getenv("OPENAI_API_BASE", "https://api.openai.com/v1")
+IMAGE_ANALYSIS_CONCURRENCY = int(os.getenv("IMAGE_ANALYSIS_CONCURRENCY", "4"))
 
 # In-memory storage
-tweets = []
+tweet_store = TweetStore()
 users = {}
 
+# Push channel: every change the store applies, local or from other workers, goes to subscribers
+feed_events = FeedBroadcaster()
+tweet_store.listeners.append(feed_events.on_change)
+
 def generate_token(username):
     """Simple token generation (not secure, for demo only)."""
     return secrets.token_hex(16) + username
@@ -42,11 +84,25 @@ def generate_token(username):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Initialize on startup and cleanup on shutdown."""
-    print(f"Starting littleX Backend Server on port {PORT}")
+    log.info("Starting littleX Backend Server on port %d", PORT)
     init_jaseci()
+    backend = create_backend()
+    replayed = backend.replay(tweet_store)
+    log.info("Loaded %d tweets (%d log records replayed)", len(tweet_store), replayed)
+    tweet_store.backend = backend
+    backend.start()
+    get_http_client()
+    await enrichment_pipeline.start()
+    image_variants.start()
+    loop_lag_monitor.start()
     yield
-    # Cleanup on shutdown if needed
-    pass
+    # Flush pending writes and drop pooled connections on shutdown
+    await loop_lag_monitor.stop()
+    await enrichment_pipeline.stop()
+    await image_variants.stop()
+    await close_http_client()
+    tweet_store.backend = None
+    backend.close()
 
 app = FastAPI(title="littleX Backend", lifespan=lifespan)
 
@@ -77,46 +133,117 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
-# Serve media files statically
-app.mount("/media", StaticFiles(directory=str(MEDIA_DIR)), name="media")
+# Outermost, so CORS handling and errors are timed too
+app.add_middleware(MetricsMiddleware)
+loop_lag_monitor = LoopLagMonitor()
+
+# Serve media files with immutable caching for content-addressed names
+@app.api_route("/media/{path:path}", methods=["GET", "HEAD"])
+async def serve_media(path: str, request: Request):
+    """Serve an uploaded file or image variant."""
+    return await media_response(path, request.headers)
 
 # Global Jaseci connector
 jaseci_connector = None
 
+# Shared pooled HTTP client for upstream LLM calls
+http_client = None
+
+# Cache of upstream LLM responses
+llm_cache = LLMCache()
+
+# Thumbnail/medium renditions of uploaded images, built off the event loop
+image_variants = ImageVariantPipeline(tweet_store.set_media_variants)
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared HTTP client, creating it on first use."""
+    global http_client
+    if http_client is None:
+        try:
+            import h2  # noqa: F401  HTTP/2 needs the optional h2 package
+            http2 = True
+        except ImportError:
+            http2 = False
+        http_client = httpx.AsyncClient(
+            http2=http2,
+            timeout=httpx.Timeout(LLM_TIMEOUT, connect=LLM_CONNECT_TIMEOUT),
+            limits=httpx.Limits(
+                max_connections=LLM_POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_POOL_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+            )
+        )
+        log.info("HTTP client initialized", extra={"http2": http2, "max_connections": LLM_POOL_MAX_CONNECTIONS})
+    return http_client
+
+async def close_http_client():
+    """Close the shared HTTP client and its pooled connections."""
+    global http_client
+    if http_client is not None:
+        await http_client.aclose()
+        http_client = None
+
 def init_jaseci():
     """Initialize Jaseci connector."""
     global jaseci_connector
     try:
         from jac_cloud.jaseci import JaseciConnector
         jaseci_connector = JaseciConnector()
-        print("✓ Jaseci connector initialized")
+        log.info("Jaseci connector initialized")
         return True
     except Exception as e:
-        print(f"Error initializing Jaseci: {e}")
+        log.warning("Error initializing Jaseci: %s", e)
         return False
 
-def run_walker(walker_name: str, payload: dict) -> dict:
+def page_params(payload: dict):
+    """
+    Validate the ``limit`` and ``cursor`` of a load_feed payload.
+
+    Returns:
+        tuple: (limit capped at FEED_MAX_LIMIT, cursor); each None if absent
+
+    Raises:
+        ValueError: If ``limit`` is not a positive integer or ``cursor`` is malformed
+    """
+    limit = payload.get("limit")
+    cursor = payload.get("cursor")
+    if limit is not None:
+        if isinstance(limit, str) and limit.isdigit():
+            limit = int(limit)
+        if isinstance(limit, bool) or not isinstance(limit, int) or limit < 1:
+            raise ValueError(f"limit must be a positive integer, got {payload['limit']!r}")
+        limit = min(limit, FEED_MAX_LIMIT)
+    if cursor is not None:
+        decode_cursor(cursor)
+    return limit, cursor
+
+async def run_walker(walker_name: str, payload: dict) -> dict:
     """Execute a walker with the given payload."""
     try:
         if walker_name == "create_tweet":
             # Get username from payload or use default
             username = payload.get("username", "guest")
             
-            tweet = {
-                "id": str(uuid.uuid4()),
-                "content": payload.get("content", ""),
-                "media": payload.get("media", []),
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "username": username,
-                "comments": [],
-                "likes": []
-            }
-            tweets.insert(0, tweet)
-            return {"reports": [[{"context": tweet}]]}
+            tweet = await tweet_store.create(
+                content=payload.get("content", ""),
+                username=username,
+                media=payload.get("media", [])
+            )
+            return {"reports": [[{"context": tweet_view(tweet)}]]}
         elif walker_name == "load_feed":
-            return {"reports": [[{"context": t} for t in tweets]]}
+            limit, cursor = page_params(payload)
+            viewer = payload.get("username")
+            if limit is None and cursor is None:
+                # Unpaged clients still get the whole feed
+                return {"reports": [[{"context": tweet_view(t, viewer)} for t in tweet_store.iter_newest()]]}
+            page, next_cursor = tweet_store.page(limit or FEED_MAX_LIMIT, cursor)
+            return {
+                "reports": [[{"context": tweet_view(t, viewer)} for t in page]],
+                "next_cursor": next_cursor
+            }
         elif walker_name == "get_profile":
             # Return mock user profile
             username = payload.get("username", "guest")
@@ -129,9 +256,30 @@ def run_walker(walker_name: str, payload: dict) -> dict:
         else:
             return {"error": f"Unknown walker: {walker_name}"}
     except Exception as e:
-        print(f"Error running walker {walker_name}: {e}")
+        log.exception("Error running walker %s", walker_name)
         return {"error": str(e)}
 
+async def stream_ndjson(tweets, viewer=None, likers=False):
+    """Serialize tweets as newline-delimited JSON, one ``{"context": ...}`` per line.
+
+    Lines are flushed in small batches and control is yielded back to the
+    event loop between them, so a large export neither builds the whole body
+    in memory nor starves other requests.
+    """
+    batch = []
+    for tweet in tweets:
+        batch.append(json.dumps({"context": tweet_view(tweet, viewer, likers)}))
+        if len(batch) >= NDJSON_BATCH_SIZE:
+            yield "\n".join(batch) + "\n"
+            batch = []
+            await asyncio.sleep(0)
+    if batch:
+        yield "\n".join(batch) + "\n"
+
+def wants_ndjson(request: Request, payload: dict) -> bool:
+    """Whether the client asked for a streamed NDJSON response."""
+    return bool(payload.get("stream")) or NDJSON_MEDIA_TYPE in request.headers.get("accept", "")
+
 # === User Endpoints ===
 
 @app.post("/user/register")
@@ -153,9 +301,8 @@ async def create_tweet(request: Request):
         
         payload = {}
         if "multipart/form-data" in content_type:
-            # Handle multipart form data (with files)
-            form_data = await request.form()
-            payload = process_multipart_create_tweet(form_data)
+            # Stream uploaded files straight to disk
+            payload = await receive_multipart_create_tweet(request)
         elif "application/json" in content_type:
             # Handle JSON
             payload = await request.json()
@@ -164,15 +311,26 @@ async def create_tweet(request: Request):
             form_data = await request.form()
             payload = process_multipart_create_tweet(form_data)
         
-        print(f"Create tweet payload: content={payload.get('content', '')[:50]}..., media_count={len(payload.get('media', []))}")
+        request_log.info("Create tweet payload", extra={
+            "content_preview": payload.get("content", "")[:50], "media_count": len(payload.get("media", []))
+        })
         
-        result = run_walker("create_tweet", payload)
+        result = await run_walker("create_tweet", payload)
+        if "reports" in result:
+            # Precompute AI annotations off the request path
+            tweet = result["reports"][0][0]["context"]
+            if llm_configured():
+                # Mock answers aren't worth precomputing, so dev mode skips this
+                await enrichment_pipeline.submit(tweet["id"])
+            image_variants.submit(tweet["id"], tweet["media"])
         return JSONResponse(status_code=200, content=result)
-        
+
+    except UploadTooLarge as e:
+        return JSONResponse(status_code=413, content={"error": str(e)})
+    except UploadError as e:
+        return JSONResponse(status_code=400, content={"error": str(e)})
     except Exception as e:
-        print(f"Error in create_tweet: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in create_tweet")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
@@ -180,31 +338,80 @@ async def create_tweet(request: Request):
 
 @app.post("/walker/load_feed")
 async def load_feed(request: Request):
-    """Load all tweets from feed."""
+    """Load tweets from feed, newest first.
+
+    Pass ``limit`` (and the ``next_cursor`` of the previous page as ``cursor``)
+    to page through the feed; without either the whole feed is returned.
+    Send ``"stream": true`` or ``Accept: application/x-ndjson`` to stream the
+    feed, or the requested page of it, as NDJSON instead; a paged stream
+    carries its next cursor in the ``X-Next-Cursor`` header.
+    """
     try:
         payload = await request.json() if request.headers.get("content-type", "").startswith("application/json") else {}
-        result = run_walker("load_feed", payload)
+        try:
+            limit, cursor = page_params(payload)
+        except ValueError as e:
+            # A client mistake, not a server error: no traceback in the logs
+            return JSONResponse(status_code=400, content={"error": str(e)})
+        if wants_ndjson(request, payload):
+            tweets, headers = tweet_store.iter_newest(), {}
+            if limit is not None or cursor is not None:
+                tweets, next_cursor = tweet_store.page(limit or len(tweet_store), cursor)
+                if next_cursor is not None:
+                    headers["X-Next-Cursor"] = next_cursor
+            return StreamingResponse(
+                stream_ndjson(tweets, payload.get("username")), media_type=NDJSON_MEDIA_TYPE, headers=headers
+            )
+        result = await run_walker("load_feed", payload)
+        if "error" in result:
+            # The parameters were valid, so this is a server fault (already logged)
+            return JSONResponse(status_code=500, content=result)
         return JSONResponse(status_code=200, content=result)
     except Exception as e:
-        print(f"Error in load_feed: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in load_feed")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
         )
 
+@app.get("/events/feed")
+async def feed_event_stream():
+    """Push feed deltas as Server-Sent Events instead of polling ``load_feed``.
+
+    Events: ``tweet`` (a new tweet), ``likes`` (tweet_id, username, liked,
+    like_count), ``comment`` (tweet_id, comment) and ``uncomment`` (tweet_id,
+    comment_id). A client that falls too far behind gets ``evicted`` and
+    should reconnect and reload the feed.
+    """
+    subscription = feed_events.subscribe()
+    if subscription is None:
+        return JSONResponse(
+            status_code=503, content={"error": "Too many event stream connections"}, headers={"Retry-After": "5"}
+        )
+    return StreamingResponse(
+        feed_events.stream(subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.get("/export/tweets")
+async def export_tweets():
+    """Stream every tweet, newest first, as NDJSON."""
+    return StreamingResponse(
+        stream_ndjson(tweet_store.iter_newest(), likers=True),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="tweets.ndjson"'}
+    )
+
 @app.post("/walker/get_profile")
 async def get_profile(request: Request):
     """Get user profile."""
     try:
         payload = await request.json() if request.headers.get("content-type", "").startswith("application/json") else {}
-        result = run_walker("get_profile", payload)
+        result = await run_walker("get_profile", payload)
         return JSONResponse(status_code=200, content=result)
     except Exception as e:
-        print(f"Error in get_profile: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in get_profile")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
@@ -217,19 +424,14 @@ async def like_tweet(tweet_id: str, request: Request):
         payload = await request.json() if request.headers.get("content-type", "").startswith("application/json") else {}
         payload["tweet_id"] = tweet_id
         
-        # Find tweet and add username to likes
-        for tweet in tweets:
-            if tweet["id"] == tweet_id:
-                username = payload.get("username", "anon")
-                if username not in tweet.get("likes", []):
-                    tweet["likes"].append(username)
-                return JSONResponse(status_code=200, content={"reports": [[{"context": tweet}]]})
+        username = payload.get("username", "anon")
+        tweet = await tweet_store.like(tweet_id, username)
+        if tweet is None:
+            return JSONResponse(status_code=404, content={"error": "Tweet not found"})
         
-        return JSONResponse(status_code=404, content={"error": "Tweet not found"})
+        return JSONResponse(status_code=200, content={"reports": [[{"context": tweet_view(tweet, username)}]]})
     except Exception as e:
-        print(f"Error in like_tweet: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in like_tweet")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
@@ -241,24 +443,27 @@ async def remove_like(tweet_id: str, request: Request):
     try:
         payload = await request.json() if request.headers.get("content-type", "").startswith("application/json") else {}
         
-        # Find tweet and remove username from likes
-        for tweet in tweets:
-            if tweet["id"] == tweet_id:
-                username = payload.get("username", "anon")
-                if username in tweet.get("likes", []):
-                    tweet["likes"].remove(username)
-                return JSONResponse(status_code=200, content={"reports": [[{"context": tweet}]]})
+        username = payload.get("username", "anon")
+        tweet = await tweet_store.unlike(tweet_id, username)
+        if tweet is None:
+            return JSONResponse(status_code=404, content={"error": "Tweet not found"})
         
-        return JSONResponse(status_code=404, content={"error": "Tweet not found"})
+        return JSONResponse(status_code=200, content={"reports": [[{"context": tweet_view(tweet, username)}]]})
     except Exception as e:
-        print(f"Error in remove_like: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in remove_like")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
         )
 
+@app.get("/tweets/{tweet_id}/likes")
+async def tweet_likes(tweet_id: str):
+    """List the usernames that like a tweet (feeds only carry the count)."""
+    likers = tweet_store.likers(tweet_id)
+    if likers is None:
+        return JSONResponse(status_code=404, content={"error": "Tweet not found"})
+    return {"like_count": len(likers), "likes": likers}
+
 @app.post("/walker/comment_tweet/{tweet_id}")
 async def comment_tweet(tweet_id: str, request: Request):
     """Add a comment to a tweet."""
@@ -276,25 +481,13 @@ async def comment_tweet(tweet_id: str, request: Request):
         if not content:
             return JSONResponse(status_code=400, content={"error": "Comment content required"})
         
-        # Find tweet and add comment
-        for tweet in tweets:
-            if tweet["id"] == tweet_id:
-                comment_id = f"comment_{len(tweet['comments'])}_{int(time.time())}"
-                comment = {
-                    "id": comment_id,
-                    "username": username,
-                    "content": content,
-                    "created_at": datetime.utcnow().isoformat(),
-                    "likes": []
-                }
-                tweet["comments"].append(comment)
-                return JSONResponse(status_code=200, content={"reports": [[{"context": tweet}]]})
+        tweet, comment = await tweet_store.add_comment(tweet_id, username, content)
+        if tweet is None:
+            return JSONResponse(status_code=404, content={"error": "Tweet not found"})
         
-        return JSONResponse(status_code=404, content={"error": "Tweet not found"})
+        return JSONResponse(status_code=200, content={"reports": [[{"context": tweet_view(tweet, username)}]]})
     except Exception as e:
-        print(f"Error in comment_tweet: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in comment_tweet")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
@@ -312,22 +505,17 @@ async def remove_comment(comment_id: str, request: Request):
         
         tweet_id = payload.get("tweet_id")
         
-        # Find tweet and remove comment
-        for tweet in tweets:
-            if tweet["id"] == tweet_id:
-                # Find and remove the comment
-                for i, comment in enumerate(tweet["comments"]):
-                    if comment["id"] == comment_id:
-                        removed = tweet["comments"].pop(i)
-                        return JSONResponse(status_code=200, content={"reports": [[{"context": tweet, "removed": removed}]]})
-                
-                return JSONResponse(status_code=404, content={"error": "Comment not found"})
+        tweet, removed = await tweet_store.remove_comment(comment_id, tweet_id)
+        if tweet is None:
+            # Without a tweet_id the owner comes from the comment index, so nothing was found
+            error = "Tweet not found" if tweet_id is not None else "Comment not found"
+            return JSONResponse(status_code=404, content={"error": error})
+        if removed is None:
+            return JSONResponse(status_code=404, content={"error": "Comment not found"})
         
-        return JSONResponse(status_code=404, content={"error": "Tweet not found"})
+        return JSONResponse(status_code=200, content={"reports": [[{"context": tweet_view(tweet, payload.get("username")), "removed": comment_view(removed)}]]})
     except Exception as e:
-        print(f"Error in remove_comment: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error in remove_comment")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
@@ -335,48 +523,93 @@ async def remove_comment(comment_id: str, request: Request):
 
 # === Assistant Endpoints ===
 
+# The missing-key warning would otherwise repeat on every call
+mock_warned = False
+
+# Error and mock LLM responses seen by the enrichment running in this context
+llm_degraded = contextvars.ContextVar("llm_degraded", default=None)
+
+def llm_configured() -> bool:
+    """Whether a real upstream is configured; without DEEPSEEK_API_KEY every answer is a mock."""
+    return bool(os.getenv("DEEPSEEK_API_KEY"))
+
+def note_llm_response(response: str):
+    """Record an error or mock response for the enrichment in progress, if any."""
+    degraded = llm_degraded.get()
+    if degraded is not None and response.startswith(("[Error]", "[Mock Response]")):
+        degraded.append(response[:100])
+
 async def call_deepseek_api(prompt: str, system_message: str = "You are a helpful assistant.") -> str:
-    """Call DeepSeek API asynchronously with proper error handling."""
+    """Call DeepSeek API asynchronously with proper error handling.
+
+    Identical requests are answered from ``llm_cache``; concurrent identical
+    requests share one upstream call.
+    """
     DEEPSEEK_API_KEY = os.getenv("DEEPSEEK_API_KEY")
     
     if not DEEPSEEK_API_KEY:
-        print("Warning: DEEPSEEK_API_KEY not set. Using mock responses.")
-        return "[Mock Response] " + prompt[:100]
+        global mock_warned
+        if not mock_warned:
+            log.warning("DEEPSEEK_API_KEY not set. Using mock responses.")
+            mock_warned = True
+        response = "[Mock Response] " + prompt[:100]
+        note_llm_response(response)
+        return response
     
+    headers = {
+        "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    
+    data = {
+        "model": "deepseek-chat",
+        "messages": [
+            {"role": "system", "content": system_message},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.7,
+        "max_tokens": 500
+    }
+    
+    key = cache_key(data["model"], system_message, prompt, data["temperature"])
+    response = await llm_cache.get_or_call(
+        key,
+        lambda: request_deepseek_completion(headers, data),
+        cacheable=cacheable_response
+    )
+    note_llm_response(response)
+    return response
+
+async def request_deepseek_completion(headers: dict, data: dict) -> str:
+    """POST one chat completion to DeepSeek and return the message text."""
+    start = time.perf_counter()
+    outcome = "error"
     try:
-        headers = {
-            "Authorization": f"Bearer {DEEPSEEK_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": "deepseek-chat",
-            "messages": [
-                {"role": "system", "content": system_message},
-                {"role": "user", "content": prompt}
-            ],
-            "temperature": 0.7,
-            "max_tokens": 500
-        }
-        
-        # Use async HTTP client
-        async with httpx.AsyncClient(timeout=15) as client:
-            response = await client.post(
-                "https://api.deepseek.com/chat/completions",
-                headers=headers,
-                json=data
-            )
+        # Reuse pooled keep-alive connections
+        response = await get_http_client().post(
+            f"{DEEPSEEK_API_BASE}/chat/completions",
+            headers=headers,
+            json=data
+        )
         
         if response.status_code == 200:
             result = response.json()
-            return result["choices"][0]["message"]["content"].strip()
+            content = result["choices"][0]["message"]["content"].strip()
+            outcome = "ok"
+            return content
         else:
-            print(f"DeepSeek API error: {response.status_code} - {response.text}")
+            log.warning("DeepSeek API error", extra={"status": response.status_code, "body": response.text[:500]})
             return f"[Error] Could not process request (Status: {response.status_code})"
             
+    except httpx.TimeoutException as e:
+        outcome = "timeout"
+        log.warning("Timeout calling DeepSeek API: %r", e)
+        return "[Error] Failed to call AI: timed out"
     except Exception as e:
-        print(f"Error calling DeepSeek API: {e}")
+        log.error("Error calling DeepSeek API: %s", e)
         return f"[Error] Failed to call AI: {str(e)}"
+    finally:
+        record_llm_call("deepseek", outcome, time.perf_counter() - start)
 
 
 # Backward compatibility alias
@@ -430,32 +663,16 @@ Return only JSON array, no other text."""
 async def extract_products_gpt(text: str) -> List[dict]:
     """Use GPT to extract products/clothing mentions from text with keyword fallback."""
     # Keyword fallback detection
-    product_keywords = [
-        "iphone", "android", "samsung", "pixel", "watch", "airpods", "headphones",
-        "laptop", "computer", "macbook", "dell", "hp", "lenovo",
-        "nike", "adidas", "puma", "reebok", "shoes", "sneakers", "boots",
-        "dress", "shirt", "pants", "jacket", "coat", "sweater", "hoodie",
-        "amazon", "ebay", "shopify", "store", "shop", "mall",
-        "apple", "google", "microsoft", "tesla", "amazon", "meta",
-        "starbucks", "mcdonald", "pizza", "burger", "coffee", "tea",
-        "netflix", "spotify", "disney", "youtube", "tiktok", "instagram"
+    products = [
+        {
+            "type": "product",
+            "name": keyword.title(),
+            "category": "detected",
+            "context": text[:100]
+        }
+        for keyword in keyword_matcher.match(text).get("product", [])
     ]
     
-    text_lower = text.lower()
-    products = []
-    detected_products = set()
-    
-    # Keyword-based detection
-    for keyword in product_keywords:
-        if keyword in text_lower and keyword not in detected_products:
-            products.append({
-                "type": "product",
-                "name": keyword.title(),
-                "category": "detected",
-                "context": text[:100]
-            })
-            detected_products.add(keyword)
-    
     # Try GPT if available
     prompt = f"""Identify all products, clothing items, and accessories mentioned in this text.
 Return as JSON array with objects containing: name, category (clothing/accessory/electronics/other), and context.
@@ -486,30 +703,16 @@ Return ONLY valid JSON array, no other text."""
 async def extract_places_gpt(text: str) -> List[dict]:
     """Use GPT to extract place/location mentions from text with keyword fallback."""
     # Keyword fallback detection
-    place_keywords = [
-        "paris", "london", "tokyo", "new york", "la", "los angeles", "tokyo", "dubai", "singapore",
-        "france", "uk", "japan", "usa", "china", "india", "brazil", "germany", "spain", "italy",
-        "restaurant", "cafe", "bar", "hotel", "airport", "station", "mall", "store", "museum",
-        "central park", "eiffel tower", "big ben", "statue of liberty", "taj mahal",
-        "brooklyn", "manhattan", "chicago", "miami", "boston", "seattle", "denver",
-        "street", "avenue", "boulevard", "city", "town", "village", "beach", "mountain", "lake"
+    places = [
+        {
+            "type": "place",
+            "name": keyword.title(),
+            "category": "location",
+            "context": text[:100]
+        }
+        for keyword in keyword_matcher.match(text).get("place", [])
     ]
     
-    text_lower = text.lower()
-    places = []
-    detected_places = set()
-    
-    # Keyword-based detection
-    for keyword in place_keywords:
-        if keyword in text_lower and keyword not in detected_places:
-            places.append({
-                "type": "place",
-                "name": keyword.title(),
-                "category": "location",
-                "context": text[:100]
-            })
-            detected_places.add(keyword)
-    
     # Try GPT if available
     prompt = f"""Identify all places, locations, venues mentioned in this text.
 Return as JSON array with objects containing: name, category (restaurant/shopping/landmark/accommodation/transportation), and context.
@@ -537,30 +740,91 @@ Return ONLY valid JSON array, no other text."""
     
     return places
 
+async def gather_with_deadline(branches: dict, deadline: float):
+    """Run independent coroutines concurrently under one shared deadline.
+
+    Args:
+        branches: Mapping of branch name to coroutine
+        deadline: Seconds to wait before cancelling unfinished branches
+
+    Returns:
+        tuple: (results, timings). ``results`` only holds branches that
+        finished; ``timings`` maps every branch to its status and elapsed ms.
+    """
+    started = time.perf_counter()
+    elapsed = {}
+
+    async def timed(name, coro):
+        try:
+            return await coro
+        finally:
+            elapsed[name] = round((time.perf_counter() - started) * 1000, 1)
+
+    tasks = {name: asyncio.create_task(timed(name, coro)) for name, coro in branches.items()}
+    try:
+        done, _ = await asyncio.wait(tasks.values(), timeout=deadline)
+    finally:
+        # Also when the caller is cancelled (client gone): no branch outlives the request
+        for task in tasks.values():
+            if not task.done():
+                task.cancel()
+
+    results = {}
+    timings = {}
+    for name, task in tasks.items():
+        if task not in done:
+            timings[name] = {"ms": round(deadline * 1000, 1), "status": "timeout"}
+        elif task.exception() is not None:
+            log.warning("Error in %s branch: %s", name, task.exception())
+            timings[name] = {"ms": elapsed[name], "status": "error"}
+        else:
+            results[name] = task.result()
+            timings[name] = {"ms": elapsed[name], "status": "ok"}
+    return results, timings
+
 @app.post("/assistant/explain")
 async def assistant_explain(payload: dict = Body(...)):
-    """Explain or translate the given text to the target language using GPT AI."""
+    """Explain or translate the given text to the target language using GPT AI.
+
+    If ``tweet_id`` names an already enriched tweet, its precomputed
+    articles, products and places are reused and only the explanation runs.
+    """
     text = payload.get("text", "")
     language = payload.get("language", "en")
+    tweet = tweet_store.get(payload.get("tweet_id"))
+    enrichment = tweet.enrichment if tweet is not None else None
+    if not text and tweet is not None:
+        text = tweet.content
     
     if not text:
         return {"error": "No text provided"}
     
-    # Use GPT to extract articles, products, and places
-    articles = await extract_articles_gpt(text)
-    products = await extract_products_gpt(text)
-    places = await extract_places_gpt(text)
-    
     # Use GPT to explain/translate the text
     if language == "en":
         explanation_prompt = f"Briefly explain this text in 2-3 sentences:\n{text}"
     else:
         explanation_prompt = f"Translate and explain this text to {language} in 2-3 sentences:\n{text}"
     
-    explanation = await call_gpt_api(
-        explanation_prompt,
-        f"You are a helpful assistant. Respond in {language}."
-    )
+    branches = {
+        "explanation": call_gpt_api(
+            explanation_prompt,
+            f"You are a helpful assistant. Respond in {language}."
+        )
+    }
+    if enrichment is None or enrichment.get("content") != text:
+        branches["articles"] = extract_articles_gpt(text)
+        branches["products"] = extract_products_gpt(text)
+        branches["places"] = extract_places_gpt(text)
+    
+    # Extraction and explanation don't depend on each other, so run them together
+    results, timings = await gather_with_deadline(branches, EXPLAIN_DEADLINE)
+    if "articles" not in branches:
+        results.update({k: enrichment[k] for k in ("articles", "products", "places")})
+    
+    articles = results.get("articles", [])
+    products = results.get("products", [])
+    places = results.get("places", [])
+    explanation = results.get("explanation", "[Error] Explanation timed out")
     
     # Build response with all extracted info
     response = {
@@ -572,11 +836,37 @@ async def assistant_explain(payload: dict = Body(...)):
             "has_articles": len(articles) > 0,
             "has_products": len(products) > 0,
             "has_places": len(places) > 0
-        }
+        },
+        "partial": any(t["status"] != "ok" for t in timings.values()),
+        "timings": timings
     }
     
     return response
 
+# Caps concurrent image analyses so slow vision calls can't hog the upstream pool
+image_analysis_slots = asyncio.Semaphore(IMAGE_ANALYSIS_CONCURRENCY)
+
+async def call_openai_chat(headers: dict, data: dict, timeout: float) -> httpx.Response:
+    """POST a chat completion to OpenAI on the shared client without blocking the event loop."""
+    async with image_analysis_slots:
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            response = await get_http_client().post(
+                f"{OPENAI_API_BASE}/chat/completions",
+                headers=headers,
+                json=data,
+                timeout=timeout
+            )
+            if response.status_code == 200:
+                outcome = "ok"
+            return response
+        except httpx.TimeoutException:
+            outcome = "timeout"
+            raise
+        finally:
+            record_llm_call("openai", outcome, time.perf_counter() - start)
+
 @app.post("/assistant/image-info")
 async def assistant_image_info(payload: dict = Body(...)):
     """Analyze image for products, places, and other information using GPT."""
@@ -610,12 +900,7 @@ async def assistant_image_info(payload: dict = Body(...)):
                 "max_tokens": 1024
             }
             
-            response = requests.post(
-                "https://api.openai.com/v1/chat/completions",
-                headers=headers,
-                json=vision_data,
-                timeout=30
-            )
+            response = await call_openai_chat(headers, vision_data, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -652,12 +937,7 @@ async def assistant_image_info(payload: dict = Body(...)):
                     "max_tokens": 500
                 }
                 
-                response = requests.post(
-                    "https://api.openai.com/v1/chat/completions",
-                    headers=headers,
-                    json=text_data,
-                    timeout=15
-                )
+                response = await call_openai_chat(headers, text_data, timeout=15)
                 
                 if response.status_code == 200:
                     result = response.json()
@@ -670,7 +950,7 @@ async def assistant_image_info(payload: dict = Body(...)):
                     }
                 
         except Exception as e:
-            print(f"Error in image analysis: {e}")
+            log.warning("Error in image analysis: %s", e)
             return {
                 "info": f"Could not analyze image: {str(e)}",
                 "detected_products": [],
@@ -763,6 +1043,39 @@ Summary:"""
     
     return response.strip()
 
+# === Tweet Enrichment ===
+
+async def enrich_tweet(tweet_id: str):
+    """Compute a tweet's summary and extracted entities once and store them."""
+    tweet = tweet_store.get(tweet_id)
+    if tweet is None or not tweet.content or not llm_configured():
+        return
+    
+    text = tweet.content
+    # The branches hide upstream failures behind fallbacks, so collect them here
+    degraded = []
+    token = llm_degraded.set(degraded)
+    try:
+        results, timings = await gather_with_deadline({
+            "summary": generate_tweet_summary(text),
+            "articles": extract_articles_gpt(text),
+            "products": extract_products_gpt(text),
+            "places": extract_places_gpt(text)
+        }, EXPLAIN_DEADLINE)
+    finally:
+        llm_degraded.reset(token)
+    
+    if len(results) < len(timings):
+        # Leave it for the on-demand path rather than storing partial results
+        raise RuntimeError(f"enrichment incomplete: {timings}")
+    if degraded:
+        # Fallback summaries and empty extractions would otherwise be served as precomputed for good
+        raise RuntimeError(f"enrichment got no real upstream answer: {degraded[0]}")
+    
+    await tweet_store.set_enrichment(tweet_id, {"content": text, **results})
+
+enrichment_pipeline = EnrichmentPipeline(enrich_tweet)
+
 # === Tweet Analysis Endpoint ===
 
 @app.post("/assistant/analyze_tweet")
@@ -782,7 +1095,20 @@ async def analyze_tweet(request: Request):
             except:
                 payload = {}
         
-        tweet_content = payload.get("content", "")
+        # Serve the precomputed summary when the tweet has been enriched
+        tweet = tweet_store.get(payload.get("tweet_id"))
+        enrichment = tweet.enrichment if tweet is not None else None
+        if enrichment is not None:
+            return JSONResponse(
+                status_code=200,
+                content={
+                    "summary": enrichment["summary"],
+                    "content_analyzed": enrichment["content"],
+                    "precomputed": True
+                }
+            )
+        
+        tweet_content = payload.get("content", "") or (tweet.content if tweet is not None else "")
         
         if not tweet_content:
             return JSONResponse(
@@ -801,9 +1127,7 @@ async def analyze_tweet(request: Request):
             }
         )
     except Exception as e:
-        print(f"Error analyzing tweet: {e}")
-        import traceback
-        traceback.print_exc()
+        log.exception("Error analyzing tweet")
         return JSONResponse(
             status_code=500,
             content={"error": str(e), "type": type(e).__name__}
@@ -811,21 +1135,35 @@ async def analyze_tweet(request: Request):
 
 # === Health & Status Endpoints ===
 
+@app.get("/assistant/cache_stats")
+async def assistant_cache_stats():
+    """LLM response cache hit/miss counters."""
+    return llm_cache.stats()
+
+@app.get("/metrics")
+async def metrics():
+    """Request, upstream LLM and event loop metrics in Prometheus text format."""
+    log_records_dropped.advance_to(dropped_records())
+    sse_connections.set(len(feed_events))
+    sse_evictions.advance_to(feed_events.evictions)
+    return Response(registry.render(), media_type=METRICS_CONTENT_TYPE)
+
 @app.get("/health")
 async def health():
     """Health check endpoint."""
-    return {"status": "ok", "media_dir": str(MEDIA_DIR)}
+    return {"status": "ok", "media_dir": str(MEDIA_DIR), "image_variants": image_variants.stats()}
 
 
 if __name__ == "__main__":
-    print(f"littleX Backend Server")
-    print(f"Port: {PORT}")
-    print(f"Media Directory: {MEDIA_DIR}")
-    print(f"Jac File: {JAC_FILE}")
+    log.info("littleX Backend Server", extra={"port": PORT, "workers": WORKERS, "media_dir": MEDIA_DIR, "jac_file": JAC_FILE})
+    if WORKERS > 1 and STORAGE_BACKEND != "sqlite":
+        raise SystemExit(f"WORKERS={WORKERS} needs a shared store; set STORAGE_BACKEND=sqlite (got {STORAGE_BACKEND!r})")
     
     uvicorn.run(
-        app,
+        # Multiple workers import the app themselves
+        "run_server:app" if WORKERS > 1 else app,
         host="0.0.0.0",
         port=PORT,
+        workers=WORKERS,
         log_level="info"
     )
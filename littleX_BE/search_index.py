@@ -0,0 +1,145 @@
+"""
+Corpus-level TF-IDF index for feed search.
+
+Tweets are tokenized once when they are written and the index keeps running
+document frequencies, so a search scores every candidate tweet against the
+query with a couple of sparse matrix-vector products over one shared
+vocabulary instead of refitting a vectorizer per tweet.
+"""
+
+import re
+
+import numpy
+from scipy import sparse
+
+# Same tokenization as sklearn's TfidfVectorizer defaults
+_TOKEN = re.compile(r"(?u)\b\w\w+\b")
+
+
+def tokenize(text):
+    return _TOKEN.findall(text.lower())
+
+
+class TweetSearchIndex:
+    """
+    Incrementally maintained TF-IDF index keyed by tweet id.
+
+    Weights follow TfidfVectorizer's defaults (raw term counts, smoothed
+    idf, l2-normalized rows), computed against the whole indexed corpus so
+    scores are comparable across tweets.
+    """
+
+    def __init__(self):
+        self._vocab = {}
+        self._df = []
+        self._docs = {}
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc_id):
+        return doc_id in self._docs
+
+    def add(self, doc_id, text):
+        """Index a tweet, replacing any previous text for ``doc_id``."""
+        if doc_id in self._docs:
+            self.remove(doc_id)
+
+        counts = {}
+        for token in tokenize(text):
+            column = self._vocab.get(token)
+            if column is None:
+                column = self._vocab[token] = len(self._df)
+                self._df.append(0)
+            counts[column] = counts.get(column, 0) + 1
+        for column in counts:
+            self._df[column] += 1
+
+        self._docs[doc_id] = (
+            numpy.fromiter(counts.keys(), dtype=numpy.int32, count=len(counts)),
+            numpy.fromiter(counts.values(), dtype=numpy.float64, count=len(counts))
+        )
+
+    update = add
+
+    def ensure(self, doc_id, text):
+        """Index a tweet only if it is not indexed yet (e.g. after a restart)."""
+        if doc_id not in self._docs:
+            self.add(doc_id, text)
+
+    def remove(self, doc_id):
+        """Drop a tweet from the index; unknown ids are ignored."""
+        doc = self._docs.pop(doc_id, None)
+        if doc is None:
+            return
+        for column in doc[0]:
+            self._df[column] -= 1
+
+    def score(self, query, doc_ids):
+        """
+        Cosine similarity between ``query`` and each of ``doc_ids``.
+
+        Returns:
+            numpy.ndarray: One score per id, in the given order; ids that are
+            not indexed score 0
+        """
+        scores = numpy.zeros(len(doc_ids))
+        query_counts = {}
+        for token in tokenize(query):
+            column = self._vocab.get(token)
+            if column is not None:
+                query_counts[column] = query_counts.get(column, 0) + 1
+        if not query_counts or not doc_ids:
+            return scores
+
+        positions, candidates = self._candidates(doc_ids)
+        if not positions:
+            return scores
+
+        idf = self._idf()
+        query_vector = numpy.zeros(len(idf))
+        for column, count in query_counts.items():
+            query_vector[column] = count * idf[column]
+        query_vector /= numpy.linalg.norm(query_vector)
+
+        dots = candidates @ (idf * query_vector)
+        norms = numpy.sqrt(candidates.multiply(candidates) @ (idf * idf))
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            similarity = numpy.where(norms > 0, dots / norms, 0.0)
+        scores[list(positions)] = similarity
+        return scores
+
+    def _idf(self):
+        n = len(self._docs)
+        df = numpy.asarray(self._df, dtype=numpy.float64)
+        return numpy.log((1 + n) / (1 + df)) + 1
+
+    def _candidates(self, doc_ids):
+        """
+        Term-count rows of the indexed ids among ``doc_ids``.
+
+        The rows are assembled from the per-tweet arrays on every search, so
+        a search costs O(candidates) and writes never invalidate anything.
+
+        Returns:
+            tuple: (positions in ``doc_ids``, csr_matrix with one row per position)
+        """
+        positions = []
+        indices = []
+        data = []
+        indptr = [0]
+        for position, doc_id in enumerate(doc_ids):
+            doc = self._docs.get(doc_id)
+            if doc is None:
+                continue
+            positions.append(position)
+            indices.append(doc[0])
+            data.append(doc[1])
+            indptr.append(indptr[-1] + len(doc[0]))
+        if not positions:
+            return positions, None
+        matrix = sparse.csr_matrix(
+            (numpy.concatenate(data), numpy.concatenate(indices), numpy.asarray(indptr)),
+            shape=(len(positions), max(len(self._df), 1))
+        )
+        return positions, matrix
@@ -0,0 +1,538 @@
+"""
+Persistence backends for the tweet store.
+
+The store keeps serving reads and writes from memory; a backend only has to
+record the store's change records durably and replay them at startup.
+``memory`` and ``log`` belong to a single process. ``sqlite`` is shared:
+every uvicorn worker keeps its own in-memory store and the database's
+change table keeps them coherent.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager
+from pathlib import Path
+
+from tweet_store import TweetStore, tweet_record
+
+log = logging.getLogger("littlex.storage")
+
+# Storage configuration
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "log")
+STORAGE_DIR = os.getenv("STORAGE_DIR", "data")
+STORAGE_FLUSH_INTERVAL = float(os.getenv("STORAGE_FLUSH_INTERVAL", "0.05"))
+STORAGE_SNAPSHOT_EVERY = int(os.getenv("STORAGE_SNAPSHOT_EVERY", "10000"))
+STORAGE_SQLITE_PATH = os.getenv("STORAGE_SQLITE_PATH", "")
+STORAGE_POLL_INTERVAL = float(os.getenv("STORAGE_POLL_INTERVAL", "0.02"))
+STORAGE_BUSY_TIMEOUT = float(os.getenv("STORAGE_BUSY_TIMEOUT", "5"))
+
+SNAPSHOT_FILE = "snapshot.jsonl"
+SEGMENT_PREFIX = "wal-"
+SEGMENT_SUFFIX = ".log"
+SQLITE_FILE = "littlex.db"
+
+
+class MemoryBackend:
+    """Backend that persists nothing; state lives only as long as the process."""
+
+    shared = False
+
+    def replay(self, store):
+        return 0
+
+    def start(self):
+        pass
+
+    def append(self, record):
+        pass
+
+    def close(self):
+        pass
+
+
+class LogBackend:
+    """
+    Append-only write-ahead log with group commit and compacted snapshots.
+
+    ``append`` serializes the record on the caller's thread and enqueues it;
+    a background writer drains the queue, writes everything that arrived
+    within ``flush_interval`` and fsyncs once per batch. Once a log segment
+    holds ``snapshot_every`` records the writer rotates to a new segment and
+    folds the old one into ``snapshot.jsonl`` from the files alone, so
+    compaction never touches the live store.
+
+    A crash can lose at most the last unflushed batch.
+    """
+
+    shared = False
+
+    def __init__(self, directory=STORAGE_DIR, flush_interval=STORAGE_FLUSH_INTERVAL,
+                 snapshot_every=STORAGE_SNAPSHOT_EVERY):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.snapshot_every = snapshot_every
+        self._queue = queue.Queue()
+        self._thread = None
+        self._segment = None
+        self._segment_no = 0
+        self._segment_records = 0
+
+    # --- Startup ---
+
+    def replay(self, store):
+        """
+        Rebuild ``store`` from the snapshot and any newer log segments.
+
+        Returns:
+            int: Number of log records replayed on top of the snapshot
+        """
+        covered = _load_snapshot(self.directory / SNAPSHOT_FILE, store)
+        replayed = 0
+        for segment_no, path in self._segments():
+            if segment_no <= covered:
+                # Already folded into the snapshot; left over from a crash mid-compaction
+                path.unlink(missing_ok=True)
+                continue
+            replayed += _replay_segment(path, store)
+            self._segment_no = segment_no
+        return replayed
+
+    def start(self):
+        """Open a fresh log segment and start the background writer."""
+        self._open_segment(self._segment_no + 1)
+        self._thread = threading.Thread(target=self._run, name="storage-writer", daemon=True)
+        self._thread.start()
+
+    # --- Request path ---
+
+    def append(self, record):
+        """Queue a change record for the next group commit."""
+        self._queue.put(json.dumps(record, separators=(",", ":")))
+
+    # --- Shutdown ---
+
+    def close(self):
+        """Flush everything queued so far and stop the writer."""
+        if self._thread is None:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+        self._segment.close()
+
+    # --- Writer thread ---
+
+    def _run(self):
+        while True:
+            line = self._queue.get()
+            batch = []
+            stopping = line is None
+            if not stopping:
+                batch.append(line)
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    remaining = deadline - time.monotonic()
+                    try:
+                        line = self._queue.get(timeout=max(remaining, 0)) if remaining > 0 else self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if line is None:
+                        stopping = True
+                        break
+                    batch.append(line)
+
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    log.exception("Error writing storage log")
+            if stopping:
+                return
+
+    def _write_batch(self, batch):
+        self._segment.write("\n".join(batch) + "\n")
+        self._segment.flush()
+        os.fsync(self._segment.fileno())
+        self._segment_records += len(batch)
+        if self._segment_records >= self.snapshot_every:
+            finished = self._segment_no
+            self._segment.close()
+            self._open_segment(finished + 1)
+            self._compact(finished)
+
+    def _open_segment(self, segment_no):
+        self._segment_no = segment_no
+        self._segment_records = 0
+        self._segment = open(self._segment_path(segment_no), "a", encoding="utf-8")
+
+    def _compact(self, upto):
+        """Fold the snapshot and every segment up to ``upto`` into a new snapshot."""
+        scratch = TweetStore()
+        _load_snapshot(self.directory / SNAPSHOT_FILE, scratch)
+        folded = []
+        for segment_no, path in self._segments():
+            if segment_no <= upto:
+                _replay_segment(path, scratch)
+                folded.append(path)
+
+        tmp = self.directory / (SNAPSHOT_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(json.dumps({"segment": upto}) + "\n")
+            for tweet in scratch.iter_oldest():
+                f.write(json.dumps(tweet_record(tweet), separators=(",", ":")) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.directory / SNAPSHOT_FILE)
+
+        for path in folded:
+            path.unlink(missing_ok=True)
+
+    def _segments(self):
+        """Return (segment number, path) for every log segment, oldest first."""
+        segments = []
+        for path in self.directory.glob(f"{SEGMENT_PREFIX}*{SEGMENT_SUFFIX}"):
+            number = path.name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]
+            if number.isdigit():
+                segments.append((int(number), path))
+        return sorted(segments)
+
+    def _segment_path(self, segment_no):
+        return self.directory / f"{SEGMENT_PREFIX}{segment_no:08d}{SEGMENT_SUFFIX}"
+
+
+def _load_snapshot(path, store):
+    """Load a snapshot into ``store``; returns the last segment it covers."""
+    if not path.exists():
+        return 0
+    with open(path, encoding="utf-8") as f:
+        header = json.loads(f.readline() or '{"segment": 0}')
+        for line in f:
+            store.apply({"op": "tweet", "tweet": json.loads(line)}, notify=False)
+    return header["segment"]
+
+
+def _replay_segment(path, store):
+    """Apply every record of one log segment; returns how many were applied."""
+    count = 0
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # Torn final write from a crash
+                break
+            # Replaying history is not news to feed subscribers
+            store.apply(record, notify=False)
+            count += 1
+    return count
+
+
+class SQLiteBackend:
+    """
+    Change log in a SQLite database in WAL mode, shared by worker processes.
+
+    Every worker keeps a full in-memory store as its hot read cache, and
+    every mutation runs inside ``transaction``: it takes SQLite's write lock
+    (``BEGIN IMMEDIATE``), applies the changes other workers committed
+    since this one last looked, then checks, applies and inserts its own
+    record. Records therefore apply in the same order in every process, and
+    check-then-act sequences (liking twice, comment id allocation) can't race
+    across workers.
+
+    Every statement runs on one dedicated database thread and is awaited, so
+    waiting up to ``busy_timeout`` for another worker's lock, committing or
+    reloading never stalls the event loop; this worker's writers queue on an
+    asyncio lock meanwhile. The event loop only applies records to the store.
+
+    The change feed is the ``changes`` table itself: a task on the event loop
+    polls ``PRAGMA data_version``, which only moves when another connection
+    commits, every ``poll_interval`` seconds and applies what is new. Reads in
+    one worker see another worker's writes within about that interval; a
+    worker always reads its own writes.
+
+    Every ``snapshot_every`` changes a background thread folds the table into
+    the ``snapshot`` table. Changes are pruned one compaction late, so a
+    worker only has to reload from scratch if it falls more than a whole
+    compaction interval behind.
+    """
+
+    shared = True
+
+    def __init__(self, path=STORAGE_SQLITE_PATH, poll_interval=STORAGE_POLL_INTERVAL,
+                 snapshot_every=STORAGE_SNAPSHOT_EVERY, busy_timeout=STORAGE_BUSY_TIMEOUT):
+        self.path = Path(path) if path else Path(STORAGE_DIR) / SQLITE_FILE
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.poll_interval = poll_interval
+        self.snapshot_every = snapshot_every
+        self.busy_timeout = busy_timeout
+        self._db = self._connect()
+        with self._db:
+            self._db.execute("CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, record TEXT NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS snapshot (position INTEGER PRIMARY KEY, record TEXT NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+        # Once the server is up, self._db is only used from this thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage-db")
+        self._lock = asyncio.Lock()
+        self._store = None
+        self._seq = 0
+        self._snapshot_seq = 0
+        self._data_version = None
+        self._writing = False
+        self._pending = []
+        self._follower = None
+        self._compactor = None
+
+    def _connect(self):
+        db = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        # WAL + NORMAL: commits don't fsync; a power cut can lose the latest ones, never corrupt
+        db.execute("PRAGMA synchronous=NORMAL")
+        return db
+
+    # --- Startup ---
+
+    def replay(self, store):
+        """
+        Rebuild ``store`` from the snapshot and the change table.
+
+        Runs once at startup, before the store serves requests.
+
+        Returns:
+            int: Number of change records replayed on top of the snapshot
+        """
+        self._store = store
+        with self._read():
+            changes = self._read_changes(None)
+        return self._apply_changes(store, changes)
+
+    def start(self):
+        """Start following other workers' changes. Must run on the event loop."""
+        self._follower = asyncio.get_running_loop().create_task(self._follow())
+
+    # --- Request path ---
+
+    @asynccontextmanager
+    async def transaction(self, store):
+        """Hold the write lock, caught up with every committed change, around a mutation."""
+        async with self._lock:
+            self._pending = []
+            try:
+                # Inside the try: if this await is cancelled the BEGIN still runs, and must be rolled back
+                changes = await self._run(self._begin, self._seq)
+                self._writing = True
+                self._apply_changes(store, changes)
+                yield
+                if self._pending:
+                    self._seq = await self._run(self._insert_and_commit, self._pending)
+                else:
+                    await self._run(self._db.execute, "COMMIT")
+            except BaseException:
+                appended = bool(self._pending)
+                await self._run(self._rollback)
+                if appended:
+                    # The record was applied in memory but never committed: drop it
+                    self._apply_changes(store, await self._run(self._read_all))
+                raise
+            finally:
+                self._writing = False
+                self._pending = []
+        if self._seq - self._snapshot_seq >= self.snapshot_every:
+            self._start_compaction()
+
+    def append(self, record):
+        """Queue a change record for the commit; only valid inside ``transaction``."""
+        if not self._writing:
+            raise RuntimeError("SQLiteBackend.append outside a transaction")
+        self._pending.append(json.dumps(record, separators=(",", ":")))
+
+    # --- Shutdown ---
+
+    def close(self):
+        """Stop following changes, wait for a running compaction and close the database."""
+        if self._follower is not None:
+            self._follower.cancel()
+            self._follower = None
+        if self._compactor is not None:
+            self._compactor.join()
+            self._compactor = None
+        self._executor.shutdown(wait=True)
+        self._db.close()
+
+    # --- Change feed ---
+
+    async def _follow(self):
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            try:
+                async with self._lock:
+                    changes = await self._run(self._poll, self._seq)
+                    if changes is not None:
+                        self._apply_changes(self._store, changes)
+            except sqlite3.Error as e:
+                log.warning("Error following storage changes: %s", e)
+
+    def _run(self, func, *args):
+        """Run ``func`` on the database thread and return an awaitable for its result."""
+        return asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    def _apply_changes(self, store, changes):
+        """
+        Apply what ``_read_changes`` returned to ``store``, on the event loop.
+
+        Returns:
+            int: Number of change records applied
+        """
+        snapshot_seq, snapshot, rows = changes
+        self._snapshot_seq = snapshot_seq
+        if snapshot is not None:
+            store.clear()
+            # A rebuild is not news to feed subscribers
+            for record in snapshot:
+                store.apply({"op": "tweet", "tweet": record}, notify=False)
+            self._seq = snapshot_seq
+        for seq, record in rows:
+            store.apply(record, notify=snapshot is None)
+            self._seq = seq
+        return len(rows)
+
+    # --- Database thread ---
+
+    @contextmanager
+    def _read(self):
+        """A read transaction, so snapshot and changes are seen consistently."""
+        self._db.execute("BEGIN")
+        try:
+            yield
+        finally:
+            self._db.execute("COMMIT")
+
+    def _meta(self, key):
+        row = self._db.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else 0
+
+    def _read_changes(self, since):
+        """
+        Read everything committed after change ``since``, decoded.
+
+        A ``since`` of None, or one a compaction has already pruned, reads
+        the snapshot as well, and applying the result rebuilds the store.
+
+        Returns:
+            tuple: (snapshot_seq, snapshot tweet records or None, [(seq, record), ...])
+        """
+        snapshot_seq = self._meta("snapshot_seq")
+        snapshot = None
+        if since is None or since < self._meta("pruned_seq"):
+            if since is not None:
+                # Changes we haven't seen were pruned by a compaction
+                log.warning("Storage fell behind a compaction; reloading the tweet store")
+            snapshot = [json.loads(raw) for (raw,) in self._db.execute("SELECT record FROM snapshot ORDER BY position")]
+            since = snapshot_seq
+        rows = [
+            (seq, json.loads(raw))
+            for seq, raw in self._db.execute("SELECT seq, record FROM changes WHERE seq > ? ORDER BY seq", (since,))
+        ]
+        return snapshot_seq, snapshot, rows
+
+    def _begin(self, since):
+        """Take the write lock (waiting up to busy_timeout) and read the changes since ``since``."""
+        self._db.execute("BEGIN IMMEDIATE")
+        try:
+            return self._read_changes(since)
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+
+    def _insert_and_commit(self, records):
+        """Insert serialized change records and commit; returns the last one's seq."""
+        for raw in records:
+            cursor = self._db.execute("INSERT INTO changes (record) VALUES (?)", (raw,))
+        self._db.execute("COMMIT")
+        return cursor.lastrowid
+
+    def _rollback(self):
+        if self._db.in_transaction:
+            self._db.execute("ROLLBACK")
+
+    def _read_all(self):
+        with self._read():
+            return self._read_changes(None)
+
+    def _poll(self, since):
+        """Changes other workers committed since ``since``, or None if nothing was committed."""
+        version = self._db.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return None
+        with self._read():
+            changes = self._read_changes(since)
+        self._data_version = version
+        return changes
+
+    # --- Compaction ---
+
+    def _start_compaction(self):
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        # Claim this compaction so other workers don't start the same one
+        self._snapshot_seq = self._seq
+        self._compactor = threading.Thread(target=self._compact, name="storage-compactor", daemon=True)
+        self._compactor.start()
+
+    def _compact(self):
+        """Fold the snapshot and changes into a new snapshot, on a connection of its own."""
+        db = self._connect()
+        try:
+            scratch = TweetStore()
+            # A read transaction sees one consistent state while writers carry on
+            db.execute("BEGIN")
+            previous = db.execute("SELECT value FROM meta WHERE key = 'snapshot_seq'").fetchone()
+            previous = previous[0] if previous else 0
+            for (raw,) in db.execute("SELECT record FROM snapshot ORDER BY position"):
+                scratch.apply({"op": "tweet", "tweet": json.loads(raw)})
+            upto = previous
+            for seq, raw in db.execute("SELECT seq, record FROM changes WHERE seq > ? ORDER BY seq", (previous,)):
+                scratch.apply(json.loads(raw))
+                upto = seq
+            db.execute("COMMIT")
+            rows = [(i, json.dumps(tweet_record(tweet), separators=(",", ":")))
+                    for i, tweet in enumerate(scratch.iter_oldest())]
+
+            db.execute("BEGIN IMMEDIATE")
+            current = db.execute("SELECT value FROM meta WHERE key = 'snapshot_seq'").fetchone()
+            if (current[0] if current else 0) != previous:
+                # Another worker compacted in the meantime
+                db.execute("ROLLBACK")
+                return
+            db.execute("DELETE FROM snapshot")
+            db.executemany("INSERT INTO snapshot (position, record) VALUES (?, ?)", rows)
+            # Keep the changes since the previous snapshot for workers still catching up
+            db.execute("DELETE FROM changes WHERE seq <= ?", (previous,))
+            db.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('snapshot_seq', ?), ('pruned_seq', ?)",
+                       (upto, previous))
+            db.execute("COMMIT")
+            log.info("Compacted storage", extra={"snapshot_seq": upto, "tweets": len(rows)})
+        except Exception:
+            if db.in_transaction:
+                db.execute("ROLLBACK")
+            log.exception("Error compacting storage")
+        finally:
+            db.close()
+
+
+def create_backend(name=STORAGE_BACKEND):
+    """Build the backend selected by ``STORAGE_BACKEND``."""
+    if name == "memory":
+        return MemoryBackend()
+    if name == "log":
+        return LogBackend()
+    if name == "sqlite":
+        return SQLiteBackend()
+    raise ValueError(f"Unknown storage backend: {name}")
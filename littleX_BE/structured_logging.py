@@ -0,0 +1,178 @@
+"""
+Non-blocking structured logging for the backend.
+
+Code logs through ordinary ``logging.getLogger("littlex.<module>")``
+loggers. ``setup_logging`` puts a single ``QueueHandler`` on the
+``littlex`` logger: the calling thread (usually the event loop) only
+builds the record and drops it on a bounded queue, and a ``QueueListener``
+thread formats it, tracebacks included, and writes it to stdout. A slow
+pipe or container log driver therefore backs up the queue instead of
+stalling requests; when the queue is full, records are dropped and counted
+rather than blocking.
+
+High-volume loggers can be sampled (``LOG_SAMPLE_RATES``); warnings and
+errors are never sampled out.
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+
+# Logging configuration
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Per-logger overrides, e.g. "littlex.storage=DEBUG,littlex.request=WARNING"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# "json" (one object per line) or "text"
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json")
+# Fraction of records kept per logger, e.g. "littlex.request=0.01"
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "littlex.request=0.01")
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+
+ROOT_LOGGER = "littlex"
+
+# Attributes every LogRecord has; anything else came in through ``extra``
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+def parse_pairs(spec, convert):
+    """Parse ``name=value,...`` into {name: convert(value)}."""
+    pairs = {}
+    for item in spec.split(","):
+        name, _, value = item.strip().partition("=")
+        if name and value:
+            pairs[name] = convert(value)
+    return pairs
+
+
+def record_fields(record):
+    """Return the structured fields a record was logged with via ``extra``."""
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: ts, level, logger, msg, extra fields and exc."""
+
+    def format(self, record):
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        entry.update(record_fields(record))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    """Human-readable lines with extra fields appended as key=value."""
+
+    def __init__(self):
+        super().__init__("%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    def format(self, record):
+        line = super().format(record)
+        fields = record_fields(record)
+        if fields:
+            extras = " ".join(f"{key}={value}" for key, value in fields.items())
+            head, sep, tail = line.partition("\n")
+            line = f"{head} {extras}{sep}{tail}"
+        return line
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of records below WARNING from the configured loggers."""
+
+    def __init__(self, rates):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(record.name)
+        return rate is None or random.random() < rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that defers formatting to the listener thread.
+
+    The stock handler formats the message and traceback before enqueueing;
+    this one only resolves ``msg % args`` and leaves the traceback for the
+    writer. A full queue drops the record and counts it.
+    """
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+_listener = None
+_handler = None
+
+
+def setup_logging(level=LOG_LEVEL, levels=LOG_LEVELS, fmt=LOG_FORMAT, sample_rates=LOG_SAMPLE_RATES,
+                  queue_size=LOG_QUEUE_SIZE, stream=None):
+    """
+    Route the ``littlex`` loggers through a background writer thread.
+
+    Safe to call more than once; later calls are ignored.
+
+    Returns:
+        logging.Logger: The ``littlex`` logger
+    """
+    global _listener, _handler
+    logger = logging.getLogger(ROOT_LOGGER)
+    if _listener is not None:
+        return logger
+
+    writer = logging.StreamHandler(stream or sys.stdout)
+    writer.setFormatter(TextFormatter() if fmt == "text" else JSONFormatter())
+
+    _handler = NonBlockingQueueHandler(queue.Queue(queue_size))
+    _handler.addFilter(SamplingFilter(parse_pairs(sample_rates, float)))
+    _listener = logging.handlers.QueueListener(_handler.queue, writer, respect_handler_level=False)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+    logger.setLevel(level.upper())
+    for name, name_level in parse_pairs(levels, str.upper).items():
+        logging.getLogger(name).setLevel(name_level)
+    logger.addHandler(_handler)
+    logger.propagate = False
+    return logger
+
+
+def shutdown_logging():
+    """Write out everything still queued and stop the writer thread."""
+    global _listener, _handler
+    if _listener is None:
+        return
+    logging.getLogger(ROOT_LOGGER).removeHandler(_handler)
+    _listener.stop()
+    _listener = None
+    _handler = None
+
+
+def dropped_records():
+    """Number of records dropped because the queue was full."""
+    return _handler.dropped if _handler is not None else 0
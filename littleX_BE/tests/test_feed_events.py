@@ -0,0 +1,99 @@
+"""Feed event streams: slow subscribers are evicted by unsent bytes or lag, not by burst size."""
+
+import asyncio
+
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+import feed_events
+from feed_events import FeedBroadcaster
+from metrics import MetricsMiddleware, http_in_flight, http_request_duration, http_requests
+
+
+def test_burst_does_not_evict_a_reading_subscriber():
+    async def run():
+        broadcaster = FeedBroadcaster()
+        subscription = broadcaster.subscribe()
+        # A change feed catch-up publishes many records in one loop turn
+        for i in range(2000):
+            broadcaster.publish("likes", {"tweet_id": str(i), "liked": True})
+        chunk = await subscription.next(1)
+        return broadcaster, subscription, chunk
+    broadcaster, subscription, chunk = asyncio.run(run())
+    assert broadcaster.evictions == 0
+    assert not subscription.evicted
+    assert chunk.count("event: likes\n") == 2000
+    assert subscription.pending_bytes == 0
+
+
+def test_unsent_bytes_past_the_limit_evict():
+    async def run():
+        broadcaster = FeedBroadcaster(buffer_bytes=1000)
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+        for i in range(50):
+            broadcaster.publish("likes", {"tweet_id": str(i)})
+            await fast.next(1)
+        return broadcaster, slow, fast, await slow.next(1)
+    broadcaster, slow, fast, chunk = asyncio.run(run())
+    assert broadcaster.evictions == 1
+    assert slow.evicted and not fast.evicted
+    assert chunk.startswith("event: evicted\n")
+    assert len(broadcaster) == 1
+
+
+def test_undrained_past_max_lag_evicts(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(feed_events.time, "monotonic", lambda: clock[0])
+
+    async def run():
+        broadcaster = FeedBroadcaster(max_lag=5)
+        slow, fast = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.publish("likes", {"tweet_id": "a"})
+        await fast.next(1)
+        clock[0] += 6
+        broadcaster.publish("likes", {"tweet_id": "b"})
+        return broadcaster, slow, fast
+    broadcaster, slow, fast = asyncio.run(run())
+    assert slow.evicted and not fast.evicted
+    assert broadcaster.evictions == 1
+
+
+def test_idle_subscriber_is_not_lagging(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr(feed_events.time, "monotonic", lambda: clock[0])
+
+    async def run():
+        broadcaster = FeedBroadcaster(max_lag=5)
+        subscription = broadcaster.subscribe()
+        clock[0] += 60
+        broadcaster.publish("likes", {"tweet_id": "a"})
+        return broadcaster, subscription
+    broadcaster, subscription = asyncio.run(run())
+    assert not subscription.evicted
+    assert broadcaster.evictions == 0
+
+
+def test_metrics_leave_event_streams_out_of_in_flight_and_latency():
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+
+    async def events():
+        yield "retry: 3000\n\n"
+
+    @app.get("/test/events")
+    async def stream():
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @app.get("/test/plain")
+    async def plain():
+        return PlainTextResponse("ok")
+
+    with TestClient(app) as client:
+        assert client.get("/test/events").status_code == 200
+        assert client.get("/test/plain").status_code == 200
+
+    assert http_in_flight.value("GET") == 0
+    assert http_requests.value("GET", "/test/events", 200) == 1
+    assert http_request_duration.count("GET", "/test/events", 200) == 0
+    assert http_request_duration.count("GET", "/test/plain", 200) == 1
@@ -0,0 +1,44 @@
+"""Keyword matcher: whole-word matching, multi-word phrases and case folding."""
+
+from keyword_matcher import KeywordMatcher, keyword_matcher
+
+DICTIONARY = {
+    "product": ["car", "phone", "Running Shoes", "mall"],
+    "place": ["New York", "new york city", "LA", "mall", "lake"]
+}
+
+
+def matcher():
+    return KeywordMatcher(DICTIONARY)
+
+
+def test_keywords_match_whole_words_only():
+    assert matcher().match("I vacuumed the carpet in Lagos") == {}
+    assert matcher().match("My car, not my carpet.") == {"product": ["car"]}
+    assert matcher().match("Flying to LA, then the lake") == {"place": ["la", "lake"]}
+
+
+def test_multi_word_keywords_match_as_consecutive_words():
+    found = matcher().match("Bought running shoes in New York City")
+    assert found == {"product": ["running shoes"], "place": ["new york", "new york city"]}
+    assert matcher().match("running late, then shoes") == {}
+    # The phrase is found past an earlier lone occurrence of its first word
+    assert matcher().match("New shoes, new york") == {"place": ["new york"]}
+
+
+def test_matching_folds_case():
+    assert matcher().match("CAR at the LAKE") == {"product": ["car"], "place": ["lake"]}
+    assert matcher().match("new YORK") == {"place": ["new york"]}
+
+
+def test_keyword_in_several_categories_is_reported_in_each_once():
+    assert matcher().match("mall, mall and more mall") == {"product": ["mall"], "place": ["mall"]}
+
+
+def test_results_follow_order_of_appearance():
+    assert matcher().match("phone then car") == {"product": ["phone", "car"]}
+
+
+def test_shipped_dictionary_loads():
+    assert keyword_matcher.vocabulary
+    assert keyword_matcher.match("") == {}
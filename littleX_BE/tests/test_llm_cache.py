@@ -0,0 +1,101 @@
+"""LLM response cache: LRU eviction, TTL expiry, single-flight calls and what is never cached."""
+
+import asyncio
+
+import pytest
+
+import llm_cache
+from llm_cache import LLMCache, cacheable_response
+
+
+def counting_call(value, calls, delay=0):
+    async def call():
+        calls.append(value)
+        if delay:
+            await asyncio.sleep(delay)
+        return value
+    return call
+
+
+def test_least_recently_used_entry_is_evicted_at_capacity():
+    async def run():
+        cache = LLMCache(max_entries=2, disk_dir="")
+        calls = []
+        await cache.get_or_call("a", counting_call("A", calls))
+        await cache.get_or_call("b", counting_call("B", calls))
+        # Touch "a" so "b" is the least recently used
+        await cache.get_or_call("a", counting_call("A", calls))
+        await cache.get_or_call("c", counting_call("C", calls))
+        await cache.get_or_call("a", counting_call("A", calls))
+        await cache.get_or_call("b", counting_call("B", calls))
+        return cache, calls
+    cache, calls = asyncio.run(run())
+    assert calls == ["A", "B", "C", "B"]
+    assert cache.evictions == 2
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_the_ttl(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr(llm_cache.time, "monotonic", lambda: clock[0])
+
+    async def run():
+        cache = LLMCache(ttl=60, disk_dir="")
+        calls = []
+        await cache.get_or_call("k", counting_call("first", calls))
+        clock[0] += 59
+        fresh = await cache.get_or_call("k", counting_call("second", calls))
+        clock[0] += 2
+        expired = await cache.get_or_call("k", counting_call("second", calls))
+        return fresh, expired, calls
+    fresh, expired, calls = asyncio.run(run())
+    assert fresh == "first"
+    assert expired == "second"
+    assert calls == ["first", "second"]
+
+
+def test_concurrent_identical_prompts_share_one_call():
+    async def run():
+        cache = LLMCache(disk_dir="")
+        calls = []
+        results = await asyncio.gather(*[
+            cache.get_or_call("k", counting_call("answer", calls, delay=0.01)) for _ in range(5)
+        ])
+        return cache, calls, results
+    cache, calls, results = asyncio.run(run())
+    assert results == ["answer"] * 5
+    assert calls == ["answer"]
+    assert cache.coalesced == 4
+    assert cache.misses == 1
+
+
+def test_a_waiter_timing_out_does_not_cancel_the_shared_call():
+    async def run():
+        cache = LLMCache(disk_dir="")
+        calls = []
+        call = counting_call("answer", calls, delay=0.05)
+        impatient = asyncio.wait_for(cache.get_or_call("k", call), 0.01)
+        patient = cache.get_or_call("k", call)
+        return await asyncio.gather(impatient, patient, return_exceptions=True), calls
+    (impatient, patient), calls = asyncio.run(run())
+    assert isinstance(impatient, asyncio.TimeoutError)
+    assert patient == "answer"
+    assert calls == ["answer"]
+
+
+@pytest.mark.parametrize("response", ["[Error] API returned 500", "[Mock Response] explain this"])
+def test_error_and_mock_responses_are_not_cached(response):
+    async def run():
+        cache = LLMCache(disk_dir="")
+        calls = []
+        for _ in range(2):
+            assert await cache.get_or_call("k", counting_call(response, calls), cacheable=cacheable_response) == response
+        return cache, calls
+    cache, calls = asyncio.run(run())
+    assert len(calls) == 2
+    assert cache.stats()["size"] == 0
+
+
+def test_real_responses_are_cacheable():
+    assert cacheable_response("A short explanation.")
+    assert not cacheable_response(None)
@@ -0,0 +1,133 @@
+"""Media uploads: only recognized images and videos are stored, under a type derived from their bytes."""
+
+import asyncio
+
+import pytest
+
+from media_handler import MultipartUpload, UploadError
+
+BOUNDARY = "littlexboundary"
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + b"\x00" * 64
+MP4 = b"\x00\x00\x00\x18ftypmp42" + b"\x00" * 64
+
+
+def multipart_body(filename, data, content_type):
+    return (
+        f"--{BOUNDARY}\r\n"
+        'Content-Disposition: form-data; name="content"\r\n\r\n'
+        "hello\r\n"
+        f"--{BOUNDARY}\r\n"
+        f'Content-Disposition: form-data; name="file"; filename="{filename}"\r\n'
+        f"Content-Type: {content_type}\r\n\r\n"
+    ).encode() + data + f"\r\n--{BOUNDARY}--\r\n".encode()
+
+
+def upload(media_dir, filename, data, content_type, chunk_size=7):
+    """Stream one file through MultipartUpload in small chunks; returns its media entries."""
+    async def run():
+        receiver = MultipartUpload(f"multipart/form-data; boundary={BOUNDARY}", media_dir=media_dir)
+        body = multipart_body(filename, data, content_type)
+        try:
+            for start in range(0, len(body), chunk_size):
+                await receiver.feed(body[start:start + chunk_size])
+            await receiver.close()
+        except Exception:
+            receiver.abort()
+            raise
+        return receiver.media
+    return asyncio.run(run())
+
+
+def stored_files(media_dir):
+    return sorted(p.name for p in media_dir.rglob("*") if p.is_file())
+
+
+def test_image_is_stored_under_its_detected_type(tmp_path):
+    [media] = upload(tmp_path, "photo.html", PNG, "text/html")
+    assert media["content_type"] == "image/png"
+    assert media["url"].endswith(".png")
+    assert stored_files(tmp_path) == [f"{media['id']}.png"]
+
+
+def test_video_is_accepted(tmp_path):
+    [media] = upload(tmp_path, "clip", MP4, "application/octet-stream")
+    assert media["content_type"] == "video/mp4"
+    assert media["url"].endswith(".mp4")
+
+
+@pytest.mark.parametrize("data", [
+    b"<html><script>alert(document.cookie)</script></html>",
+    b'<svg xmlns="http://www.w3.org/2000/svg"><script>alert(1)</script></svg>',
+    b"GIF",
+    b""
+])
+def test_anything_else_is_rejected_and_not_stored(tmp_path, data):
+    with pytest.raises(UploadError):
+        upload(tmp_path, "x.png", data, "image/png")
+    assert stored_files(tmp_path) == []
+
+
+@pytest.fixture
+def media_client(tmp_path):
+    """A client for the same /media route run_server.py mounts, serving from a temporary media dir."""
+    from fastapi import FastAPI, Request
+    from fastapi.testclient import TestClient
+
+    from media_handler import media_response
+
+    media_dir = tmp_path / "media"
+    media_dir.mkdir()
+    app = FastAPI()
+
+    @app.api_route("/media/{path:path}", methods=["GET", "HEAD"])
+    async def serve_media(path: str, request: Request):
+        return await media_response(path, request.headers, media_dir=str(media_dir))
+
+    return TestClient(app), media_dir
+
+
+@pytest.mark.parametrize("url", [
+    "/media//etc/passwd",
+    "/media/%2Fetc/passwd",
+    "/media/../../../etc/passwd",
+    "/media/%2E%2E/%2E%2E/etc/passwd",
+    "/media/ab/..%2F..%2Fsecret.txt"
+])
+def test_paths_outside_the_media_dir_are_not_served(media_client, url):
+    client, media_dir = media_client
+    (media_dir.parent / "secret.txt").write_text("secret")
+    response = client.get(url)
+    assert response.status_code == 404
+    assert "root:" not in response.text and "secret" not in response.text
+
+
+def test_symlinks_out_of_the_media_dir_are_not_followed(media_client):
+    client, media_dir = media_client
+    (media_dir.parent / "secret.txt").write_text("secret")
+    (media_dir / "link.png").symlink_to(media_dir.parent / "secret.txt")
+    assert client.get("/media/link.png").status_code == 404
+
+
+def test_media_is_served_inline_with_nosniff(media_client):
+    client, media_dir = media_client
+    [media] = upload(media_dir, "photo.png", PNG, "image/png")
+    response = client.get(media["url"])
+    assert response.status_code == 200
+    assert response.content == PNG
+    assert response.headers["content-type"] == "image/png"
+    assert response.headers["x-content-type-options"] == "nosniff"
+    assert "content-disposition" not in response.headers
+    assert "immutable" in response.headers["cache-control"]
+
+
+def test_other_files_are_served_as_attachments(media_client):
+    client, media_dir = media_client
+    # Stored before uploads were type-checked
+    name = "0" * 64 + ".html"
+    (media_dir / "00").mkdir()
+    (media_dir / "00" / name).write_text("<script>alert(1)</script>")
+    response = client.get(f"/media/00/{name}")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert response.headers["content-disposition"].startswith("attachment")
+    assert response.headers["x-content-type-options"] == "nosniff"
@@ -0,0 +1,23 @@
+"""Metrics exposition: monotonic totals counted elsewhere are exposed as counters."""
+
+from metrics import Registry, log_records_dropped, registry, sse_evictions
+
+
+def test_advance_to_follows_a_monotonic_total():
+    counter = Registry().counter("test_events_total", "Events.")
+    counter.advance_to(3)
+    counter.advance_to(7)
+    # A stale reading never moves a counter backwards
+    counter.advance_to(5)
+    assert counter.value() == 7
+    assert list(counter.samples()) == ["test_events_total 7"]
+
+
+def test_monotonic_totals_are_counters():
+    text = registry.render()
+    for metric, name in [
+        (log_records_dropped, "littlex_log_records_dropped_total"),
+        (sse_evictions, "littlex_sse_evictions_total")
+    ]:
+        assert metric.name == name
+        assert f"# TYPE {name} counter" in text
@@ -0,0 +1,86 @@
+"""Keyset pagination over the tweet store: cursors, the last page and cursors whose tweet is gone."""
+
+import base64
+import uuid
+
+import pytest
+
+from tweet_store import TweetStore, decode_cursor, encode_cursor
+
+
+def tweet_record(n):
+    return {"op": "tweet", "tweet": {
+        "id": str(uuid.UUID(int=n + 1)),
+        "content": f"tweet {n}",
+        "media": [],
+        "created_at": f"2026-01-01T00:00:{n:02d}+00:00",
+        "username": "alice",
+        "comments": {},
+        "likes": []
+    }}
+
+
+def build_store(records):
+    store = TweetStore()
+    for record in records:
+        store.apply(record, notify=False)
+    return store
+
+
+def contents(tweets):
+    return [tweet.content for tweet in tweets]
+
+
+def test_cursor_pages_through_the_feed_newest_first():
+    store = build_store(tweet_record(n) for n in range(7))
+    seen, cursor, pages = [], None, 0
+    while True:
+        tweets, cursor = store.page(3, cursor)
+        seen.extend(contents(tweets))
+        pages += 1
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seen == [f"tweet {n}" for n in reversed(range(7))]
+
+
+def test_last_page_has_no_next_cursor():
+    store = build_store(tweet_record(n) for n in range(4))
+    tweets, cursor = store.page(4)
+    assert contents(tweets) == ["tweet 3", "tweet 2", "tweet 1", "tweet 0"]
+    assert cursor is None
+    assert store.page(10)[1] is None
+    assert TweetStore().page(5) == ([], None)
+
+
+def test_cursor_of_a_missing_tweet_falls_back_to_created_at():
+    records = [tweet_record(n) for n in range(6)]
+    full = build_store(records)
+    _, cursor = full.page(2)
+    assert decode_cursor(cursor)[1] == str(uuid.UUID(int=5))
+
+    # The same feed without the tweet the cursor points at (tweet 4)
+    pruned = build_store(record for n, record in enumerate(records) if n != 4)
+    tweets, _ = pruned.page(2, cursor)
+    assert contents(tweets) == ["tweet 3", "tweet 2"]
+
+
+@pytest.mark.parametrize("cursor", [
+    "not base64!",
+    base64.urlsafe_b64encode(b"not json").decode(),
+    base64.urlsafe_b64encode(b'["2026-01-01T00:00:00+00:00"]').decode(),
+    base64.urlsafe_b64encode(b'[1, "id"]').decode(),
+    base64.urlsafe_b64encode(b'["yesterday", "id"]').decode(),
+])
+def test_malformed_cursor_is_rejected(cursor):
+    store = build_store(tweet_record(n) for n in range(3))
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+    with pytest.raises(ValueError):
+        store.page(2, cursor)
+
+
+def test_cursor_round_trips():
+    store = build_store([tweet_record(3)])
+    tweet = store.get(str(uuid.UUID(int=4)))
+    assert decode_cursor(encode_cursor(tweet)) == (tweet.created_at, tweet.id)
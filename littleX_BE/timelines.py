@@ -0,0 +1,117 @@
+"""
+Materialized home timelines for load_feed.
+
+Each profile's home timeline is a bounded ring of the most recent tweet ids
+from the profile itself and everyone it follows. create_tweet pushes a new
+tweet onto its followers' rings (fan-out on write), so a feed read no longer
+walks every followee's tweets. Authors with more followers than
+``TIMELINE_FANOUT_LIMIT`` are not fanned out; readers pull their tweets at
+read time instead (hybrid push/pull).
+
+Timelines live in memory. A profile without one (new reader, restart) is
+rebuilt from the graph on its next read.
+"""
+
+import heapq
+import os
+from collections import deque
+
+# Timeline configuration
+TIMELINE_SIZE = int(os.getenv("TIMELINE_SIZE", "800"))
+TIMELINE_FANOUT_LIMIT = int(os.getenv("TIMELINE_FANOUT_LIMIT", "10000"))
+
+
+class HomeTimelines:
+    """
+    Per-profile rings of ``(created_at, tweet_id, author_id)`` entries, oldest
+    first, keyed by profile id.
+    """
+
+    def __init__(self, size=TIMELINE_SIZE, fanout_limit=TIMELINE_FANOUT_LIMIT):
+        self.size = size
+        self.fanout_limit = fanout_limit
+        self._timelines = {}
+        self._pulled = set()
+
+    def __contains__(self, profile_id):
+        return profile_id in self._timelines
+
+    def get(self, profile_id):
+        """
+        Tweet ids on a profile's home timeline, oldest first.
+
+        Returns:
+            list | None: None if the timeline is not materialized yet
+        """
+        timeline = self._timelines.get(profile_id)
+        if timeline is None:
+            return None
+        return [tweet_id for _, tweet_id, _ in timeline]
+
+    def rebuild(self, profile_id, entries):
+        """Materialize a timeline from ``(created_at, tweet_id, author_id)`` entries."""
+        entries = [entry for entry in entries if entry[2] == profile_id or entry[2] not in self._pulled]
+        self._timelines[profile_id] = deque(sorted(entries), maxlen=self.size)
+
+    def drop(self, profile_id):
+        """Forget a timeline so the next read rebuilds it."""
+        self._timelines.pop(profile_id, None)
+
+    def is_pulled(self, author_id):
+        """Whether ``author_id``'s tweets are read at load time instead of pushed."""
+        return author_id in self._pulled
+
+    def push(self, entry, follower_ids):
+        """
+        Fan a new tweet out to its author's and followers' timelines.
+
+        An author whose follower count exceeds ``fanout_limit`` switches to
+        pull mode for good; their tweets are then merged in at read time.
+
+        Returns:
+            bool: False if the tweet was not fanned out to followers
+        """
+        author_id = entry[2]
+        fanned_out = True
+        if author_id in self._pulled or len(follower_ids) > self.fanout_limit:
+            self._pulled.add(author_id)
+            follower_ids = ()
+            fanned_out = False
+
+        for profile_id in (author_id, *follower_ids):
+            timeline = self._timelines.get(profile_id)
+            if timeline is not None:
+                timeline.append(entry)
+        return fanned_out
+
+    def follow(self, profile_id, entries):
+        """Merge a newly followed author's tweets into ``profile_id``'s timeline."""
+        timeline = self._timelines.get(profile_id)
+        if timeline is None or not entries:
+            return
+        entries = [entry for entry in entries if entry[2] not in self._pulled]
+        self._timelines[profile_id] = deque(heapq.merge(timeline, sorted(entries)), maxlen=self.size)
+
+    def unfollow(self, profile_id, author_id):
+        """Remove an unfollowed author's tweets from ``profile_id``'s timeline."""
+        timeline = self._timelines.get(profile_id)
+        if timeline is None:
+            return
+        if len(timeline) == self.size:
+            # Older tweets from other authors were evicted; rebuild on next read
+            self.drop(profile_id)
+            return
+        self._timelines[profile_id] = deque(
+            (entry for entry in timeline if entry[2] != author_id), maxlen=self.size
+        )
+
+    def discard(self, tweet_id, profile_ids):
+        """Remove a deleted tweet from the given profiles' timelines."""
+        for profile_id in profile_ids:
+            timeline = self._timelines.get(profile_id)
+            if timeline is None:
+                continue
+            for entry in timeline:
+                if entry[1] == tweet_id:
+                    timeline.remove(entry)
+                    break
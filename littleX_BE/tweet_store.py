@@ -0,0 +1,514 @@
+"""
+In-memory tweet store with hash-indexed lookups and a time-ordered log.
+
+Tweets and comments are held as compact ``__slots__`` records: 16-byte
+binary ids, integer epoch-microsecond timestamps and interned usernames.
+They are rendered into JSON-shaped dicts only at the edges, by
+``tweet_view`` for responses and ``tweet_record`` for persistence.
+"""
+
+import base64
+import bisect
+import json
+import sys
+import time
+import uuid
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# Comment ids are comment_<seq>_<unix seconds>; both fit one int key
+COMMENT_STAMP_BITS = 40
+COMMENT_STAMP_MASK = (1 << COMMENT_STAMP_BITS) - 1
+
+
+def to_epoch_us(timestamp):
+    """Convert an ISO-8601 timestamp to integer microseconds since the epoch."""
+    moment = datetime.fromisoformat(timestamp)
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return (moment - EPOCH) // MICROSECOND
+
+
+def from_epoch_us(epoch_us):
+    """Render epoch microseconds as the UTC ISO-8601 string clients expect."""
+    return (EPOCH + epoch_us * MICROSECOND).isoformat()
+
+
+def tweet_key(tweet_id):
+    """Binary key of a tweet id (a uuid string), or None if it isn't one."""
+    try:
+        return uuid.UUID(tweet_id).bytes
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def comment_key(comment_id):
+    """Integer key of a ``comment_<seq>_<seconds>`` id, or None if it isn't one."""
+    parts = comment_id.split("_") if isinstance(comment_id, str) else ()
+    if len(parts) != 3 or parts[0] != "comment" or not parts[1].isdigit() or not parts[2].isdigit():
+        return None
+    stamp = int(parts[2])
+    if stamp > COMMENT_STAMP_MASK:
+        return None
+    return (int(parts[1]) << COMMENT_STAMP_BITS) | stamp
+
+
+class Comment:
+    """One comment on a tweet."""
+
+    __slots__ = ("key", "username", "content", "created_at")
+
+    def __init__(self, key, username, content, created_at):
+        self.key = key
+        self.username = sys.intern(username)
+        self.content = content
+        self.created_at = created_at
+
+    @property
+    def id(self):
+        return f"comment_{self.key >> COMMENT_STAMP_BITS}_{self.key & COMMENT_STAMP_MASK}"
+
+    @classmethod
+    def from_record(cls, record):
+        """
+        Build a comment from its JSON-shaped record.
+
+        Raises:
+            ValueError: If the comment id is not a ``comment_<seq>_<seconds>`` id
+        """
+        key = comment_key(record["id"])
+        if key is None:
+            raise ValueError(f"Invalid comment id: {record['id']!r}")
+        return cls(key, record["username"], record["content"], to_epoch_us(record["created_at"]))
+
+
+class Tweet:
+    """
+    One stored tweet.
+
+    Empty collections are stored as None (or the shared empty tuple for
+    media) so the common tweet with no likes or comments pays nothing for
+    them.
+    """
+
+    __slots__ = ("key", "content", "media", "created_at", "username",
+                 "comments", "likes", "like_count", "enrichment")
+
+    def __init__(self, key, content, media, created_at, username, comments=None, likes=None, enrichment=None):
+        self.key = key
+        self.content = content
+        self.media = tuple(media)
+        self.created_at = created_at
+        self.username = sys.intern(username)
+        self.comments = comments or None
+        self.likes = {sys.intern(name) for name in likes} if likes else None
+        self.like_count = len(self.likes) if self.likes else 0
+        self.enrichment = enrichment
+
+    @property
+    def id(self):
+        return str(uuid.UUID(bytes=self.key))
+
+    @classmethod
+    def from_record(cls, record):
+        """Build a tweet from its JSON-shaped record."""
+        comments = {}
+        for item in record.get("comments", {}).values():
+            comment = Comment.from_record(item)
+            comments[comment.key] = comment
+        return cls(
+            uuid.UUID(record["id"]).bytes,
+            record["content"],
+            record.get("media") or (),
+            to_epoch_us(record["created_at"]),
+            record["username"],
+            comments,
+            record.get("likes"),
+            record.get("enrichment")
+        )
+
+    def liked_by(self, username):
+        return self.likes is not None and username in self.likes
+
+    def add_like(self, username):
+        if self.liked_by(username):
+            return
+        if self.likes is None:
+            self.likes = set()
+        self.likes.add(sys.intern(username))
+        self.like_count += 1
+
+    def remove_like(self, username):
+        if not self.liked_by(username):
+            return
+        self.likes.discard(username)
+        self.like_count -= 1
+        if not self.likes:
+            self.likes = None
+
+    def add_comment(self, comment):
+        if self.comments is None:
+            self.comments = {}
+        self.comments[comment.key] = comment
+
+    def pop_comment(self, key):
+        """Remove and return the comment with ``key``, or None."""
+        if self.comments is None:
+            return None
+        comment = self.comments.pop(key, None)
+        if not self.comments:
+            self.comments = None
+        return comment
+
+
+class TweetStore:
+    """
+    Holds every tweet behind an id index so lookups and mutations are O(1).
+
+    Tweets are appended to a creation-ordered log; newest-first reads walk
+    that log in reverse instead of paying for ``list.insert(0, ...)`` on
+    every post. Each tweet keeps its comments in a dict keyed by comment id,
+    and the store keeps a comment id -> tweet id index so a comment can be
+    removed without scanning anything. Likes are a set of usernames with a
+    maintained ``like_count``, so liking, unliking and "did I like this"
+    are O(1) however many likers a tweet has. Tweets are indexed by their
+    binary id and comments by their integer key (see ``comment_key``).
+
+    Every mutation is expressed as a change record that is applied in memory
+    and then handed to the persistence backend, so replaying the same records
+    rebuilds the same store (see ``storage.py``). Mutations are coroutines: a
+    shared backend wraps each one in its write transaction, whose database
+    work is awaited rather than run on the event loop, so the check a method
+    makes and the record it commits can't interleave with another process's
+    writes.
+    """
+
+    def __init__(self, backend=None):
+        self.clear()
+        self.backend = backend
+        # Called as listener(record, tweet) after each applied record
+        self.listeners = []
+
+    def clear(self):
+        """Forget every tweet (used when a shared backend reloads the store)."""
+        self._by_id = {}
+        self._log = []
+        self._position = {}
+        self._comment_owner = {}
+        self._next_comment = 0
+
+    def __len__(self):
+        return len(self._log)
+
+    def get(self, tweet_id):
+        """Return the tweet record for ``tweet_id`` or None."""
+        return self._by_id.get(tweet_key(tweet_id))
+
+    async def create(self, content, username, media=None):
+        """
+        Create and index a new tweet.
+
+        Args:
+            content: Tweet text
+            username: Author username
+            media: Optional list of media references
+
+        Returns:
+            Tweet: The stored tweet
+        """
+        async with self._writing():
+            # Stamped under the write lock, so created_at order matches log order in every worker
+            tweet = {
+                "id": str(uuid.uuid4()),
+                "content": content,
+                "media": media or [],
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "username": username,
+                "comments": {},
+                "likes": []
+            }
+            return self._commit({"op": "tweet", "tweet": tweet})
+
+    def iter_newest(self):
+        """Yield tweets newest first."""
+        return reversed(self._log)
+
+    def iter_oldest(self):
+        """Yield tweets oldest first."""
+        return iter(self._log)
+
+    def page(self, limit, cursor=None):
+        """
+        Return one newest-first page of tweets.
+
+        Args:
+            limit: Maximum number of tweets in the page
+            cursor: Opaque cursor from a previous page, or None for the newest
+
+        Returns:
+            tuple: (list of tweets, next cursor or None on the last page)
+
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        end = len(self._log) if cursor is None else self._cursor_position(cursor)
+        start = max(end - limit, 0)
+        tweets = self._log[start:end]
+        tweets.reverse()
+        next_cursor = encode_cursor(self._log[start]) if start > 0 else None
+        return tweets, next_cursor
+
+    def _cursor_position(self, cursor):
+        """Map a cursor to the log index of the first tweet after it."""
+        created_at, tweet_id = decode_cursor(cursor)
+        position = self._position.get(tweet_key(tweet_id))
+        if position is not None and self._log[position].created_at == created_at:
+            return position
+        # Unknown id: fall back to the keyset on created_at alone
+        return bisect.bisect_left(self._log, created_at, key=lambda t: t.created_at)
+
+    def likers(self, tweet_id):
+        """Return the usernames that like a tweet, or None if it is unknown."""
+        tweet = self.get(tweet_id)
+        if tweet is None:
+            return None
+        return sorted(tweet.likes or ())
+
+    async def like(self, tweet_id, username):
+        """Add ``username`` to a tweet's likes. Returns the tweet or None."""
+        async with self._writing():
+            tweet = self.get(tweet_id)
+            if tweet is None or tweet.liked_by(username):
+                return tweet
+            return self._commit({"op": "like", "tweet_id": tweet_id, "username": username})
+
+    async def unlike(self, tweet_id, username):
+        """Remove ``username`` from a tweet's likes. Returns the tweet or None."""
+        async with self._writing():
+            tweet = self.get(tweet_id)
+            if tweet is None or not tweet.liked_by(username):
+                return tweet
+            return self._commit({"op": "unlike", "tweet_id": tweet_id, "username": username})
+
+    async def add_comment(self, tweet_id, username, content):
+        """
+        Attach a comment to a tweet.
+
+        Returns:
+            tuple: (tweet, comment), or (None, None) if the tweet is unknown
+        """
+        async with self._writing():
+            tweet = self.get(tweet_id)
+            if tweet is None:
+                return None, None
+
+            comment = {
+                "id": f"comment_{self._next_comment}_{int(time.time())}",
+                "username": username,
+                "content": content,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "likes": []
+            }
+            self._commit({"op": "comment", "tweet_id": tweet_id, "comment": comment})
+            return tweet, tweet.comments[comment_key(comment["id"])]
+
+    async def remove_comment(self, comment_id, tweet_id=None):
+        """
+        Remove a comment by id.
+
+        Args:
+            comment_id: Comment to remove
+            tweet_id: Owning tweet; looked up from the comment index if omitted
+
+        Returns:
+            tuple: (tweet, removed comment). Both are None if the tweet is
+            unknown or, without ``tweet_id``, if no comment has that id; the
+            comment is None if the tweet has no such comment.
+        """
+        key = comment_key(comment_id)
+        async with self._writing():
+            if tweet_id is None:
+                owner = self._comment_owner.get(key)
+                if owner is None:
+                    return None, None
+                tweet = self._by_id.get(owner)
+                tweet_id = tweet.id if tweet is not None else None
+            else:
+                tweet = self.get(tweet_id)
+            if tweet is None:
+                return None, None
+
+            removed = tweet.comments.get(key) if tweet.comments else None
+            if removed is not None:
+                self._commit({"op": "uncomment", "tweet_id": tweet_id, "comment_id": comment_id})
+            return tweet, removed
+
+    async def set_enrichment(self, tweet_id, enrichment):
+        """Store precomputed AI annotations on a tweet. Returns the tweet or None."""
+        async with self._writing():
+            if self.get(tweet_id) is None:
+                return None
+            return self._commit({"op": "enrich", "tweet_id": tweet_id, "enrichment": enrichment})
+
+    async def set_media_variants(self, tweet_id, media_id, variants):
+        """Attach rendered image variants to one media entry. Returns the tweet or None."""
+        async with self._writing():
+            if self.get(tweet_id) is None:
+                return None
+            return self._commit({"op": "variants", "tweet_id": tweet_id, "media_id": media_id, "variants": variants})
+
+    def _writing(self):
+        """The backend's (async) write transaction, for backends shared between processes."""
+        transaction = getattr(self.backend, "transaction", None)
+        return transaction(self) if transaction is not None else nullcontext()
+
+    def _commit(self, record):
+        """Apply a change record and hand it to the backend."""
+        result = self.apply(record)
+        if self.backend is not None:
+            self.backend.append(record)
+        return result
+
+    def apply(self, record, notify=True):
+        """
+        Apply one change record without persisting it.
+
+        Used both by the mutation methods and when replaying a backend.
+
+        Args:
+            record: Change record
+            notify: Tell ``listeners`` about it (off when rebuilding the store)
+
+        Returns:
+            Tweet: The tweet the record touched, or None if it is unknown
+        """
+        tweet = self._apply(record)
+        if notify and tweet is not None:
+            for listener in self.listeners:
+                listener(record, tweet)
+        return tweet
+
+    def _apply(self, record):
+        op = record["op"]
+        if op == "tweet":
+            # Records stay JSON-shaped; the live copy is a compact Tweet
+            tweet = Tweet.from_record(record["tweet"])
+            self._by_id[tweet.key] = tweet
+            self._position[tweet.key] = len(self._log)
+            self._log.append(tweet)
+            for key in tweet.comments or ():
+                self._index_comment(key, tweet.key)
+            return tweet
+
+        tweet = self.get(record["tweet_id"])
+        if tweet is None:
+            return None
+        if op == "like":
+            tweet.add_like(record["username"])
+        elif op == "unlike":
+            tweet.remove_like(record["username"])
+        elif op == "comment":
+            comment = Comment.from_record(record["comment"])
+            tweet.add_comment(comment)
+            self._index_comment(comment.key, tweet.key)
+        elif op == "uncomment":
+            key = comment_key(record["comment_id"])
+            if tweet.pop_comment(key) is not None:
+                self._comment_owner.pop(key, None)
+        elif op == "enrich":
+            tweet.enrichment = record["enrichment"]
+        elif op == "variants":
+            for item in tweet.media:
+                if isinstance(item, dict) and item.get("id") == record["media_id"]:
+                    item["variants"] = record["variants"]
+        else:
+            raise ValueError(f"Unknown change record: {op!r}")
+        return tweet
+
+    def _index_comment(self, key, tweet_key):
+        self._comment_owner[key] = tweet_key
+        # Keep comment ids unique across restarts: comment_<seq>_<timestamp>
+        self._next_comment = max(self._next_comment, (key >> COMMENT_STAMP_BITS) + 1)
+
+
+def encode_cursor(tweet):
+    """Build an opaque (created_at, id) keyset cursor for a tweet."""
+    raw = json.dumps([from_epoch_us(tweet.created_at), tweet.id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode("ascii")
+
+
+def decode_cursor(cursor):
+    """
+    Decode a cursor produced by :func:`encode_cursor`.
+
+    Returns:
+        tuple: (created_at in epoch microseconds, tweet id)
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        created_at, tweet_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        if not isinstance(created_at, str) or not isinstance(tweet_id, str):
+            raise TypeError("cursor fields must be strings")
+        return to_epoch_us(created_at), tweet_id
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+
+def comment_view(comment):
+    """Render a comment into its JSON shape (also its persisted record)."""
+    return {
+        "id": comment.id,
+        "username": comment.username,
+        "content": comment.content,
+        "created_at": from_epoch_us(comment.created_at),
+        "likes": []
+    }
+
+
+def tweet_record(tweet):
+    """Render a live tweet back into the JSON-shaped record it was built from."""
+    record = {
+        "id": tweet.id,
+        "content": tweet.content,
+        "media": list(tweet.media),
+        "created_at": from_epoch_us(tweet.created_at),
+        "username": tweet.username,
+        "comments": {c.id: comment_view(c) for c in (tweet.comments or {}).values()},
+        "likes": sorted(tweet.likes or ())
+    }
+    if tweet.enrichment is not None:
+        record["enrichment"] = tweet.enrichment
+    return record
+
+
+def tweet_view(tweet, viewer=None, likers=False):
+    """
+    Render a stored tweet record into its JSON response shape.
+
+    Args:
+        tweet: Stored tweet
+        viewer: Username the response is for, used for ``liked_by_me``
+        likers: Also include the full ``likes`` list (exports)
+
+    Returns:
+        dict: JSON-serializable tweet
+    """
+    # Enrichment is served by the assistant endpoints, not the feed
+    view = {
+        "id": tweet.id,
+        "content": tweet.content,
+        "media": list(tweet.media),
+        "created_at": from_epoch_us(tweet.created_at),
+        "username": tweet.username,
+        "comments": [comment_view(c) for c in (tweet.comments or {}).values()],
+        "like_count": tweet.like_count,
+        "liked_by_me": viewer is not None and tweet.liked_by(viewer)
+    }
+    if likers:
+        view["likes"] = sorted(tweet.likes or ())
+    return view
@@ -103,6 +103,8 @@ const MainFeedContent = ({
                   username={tweet.username}
                   content={tweet.content}
                   comments={tweet.comments}
+                  likeCount={tweet.like_count}
+                  likedByMe={tweet.liked_by_me}
                   likes={tweet.likes}
                   created_at={tweet.created_at}
                   profile={profile}
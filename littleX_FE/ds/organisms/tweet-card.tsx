@@ -58,13 +58,16 @@ import {
   DropdownMenuTrigger,
 } from "../atoms/dropdown-menu";
 import { getTimeDifference } from "@/modules/tweet/utils";
+import { TweetApi } from "@/modules/tweet/services";
 
 // Define interfaces
 export interface TweetCardProps {
   id: string;
   username: string;
   content: string;
-  likes: string[];
+  likeCount: number;
+  likedByMe: boolean;
+  likes?: string[];
   comments: Comment[];
   profile: User;
   created_at?: string;
@@ -73,7 +76,9 @@ export interface TweetCardProps {
 interface LikesDialogProps {
   isOpen: boolean;
   onOpenChange: (isOpen: boolean) => void;
-  likes: string[];
+  tweetId: string;
+  likeCount: number;
+  knownLikes?: string[];
 }
 
 interface CommentsDialogProps {
@@ -101,8 +106,25 @@ interface ActionDropdownProps {
 function LikesDialog({
   isOpen,
   onOpenChange,
-  likes,
+  tweetId,
+  likeCount,
+  knownLikes,
 }: LikesDialogProps): JSX.Element {
+  const [likes, setLikes] = useState<string[]>([]);
+
+  // Feeds only carry the count; load the likers when the dialog opens,
+  // unless the backend already sent them with the tweet
+  useEffect(() => {
+    if (!isOpen) return;
+    if (knownLikes) {
+      setLikes(knownLikes);
+      return;
+    }
+    TweetApi.getLikes(tweetId)
+      .then(setLikes)
+      .catch((error) => console.error("Error loading likes:", error));
+  }, [isOpen, tweetId, likeCount, knownLikes]);
+
   return (
     <Dialog open={isOpen} onOpenChange={onOpenChange}>
       <DialogContent className="sm:max-w-md">
@@ -286,6 +308,8 @@ export function TweetCard({
   id,
   username,
   content,
+  likeCount,
+  likedByMe,
   likes,
   comments,
   profile,
@@ -312,6 +336,7 @@ export function TweetCard({
         setAnalysisData(null); // Clear previous data immediately
         try {
           const response = await private_api.post("/assistant/analyze_tweet", {
+            tweet_id: id,
             content: content,
           });
           setAnalysisData(response.data);
@@ -331,9 +356,7 @@ export function TweetCard({
 
   const loginUsername: string = profile.username;
 
-  const liked: boolean = !!likes.find(
-    (person) => person.toLowerCase() === loginUsername.toLowerCase()
-  );
+  const liked: boolean = likedByMe;
 
   const handleLike = (id: string): void => {
     if (liked) {
@@ -446,7 +469,7 @@ export function TweetCard({
                     liked ? "text-foreground" : "text-muted-foreground"
                   }`}
                 >
-                  {likes.length} Likes
+                  {likeCount} Likes
                 </button>
               </div>
 
@@ -498,7 +521,9 @@ export function TweetCard({
       <LikesDialog
         isOpen={isLikesDialogOpen}
         onOpenChange={setIsLikesDialogOpen}
-        likes={likes}
+        tweetId={id}
+        likeCount={likeCount}
+        knownLikes={likes}
       />
 
       <CommentsDialog
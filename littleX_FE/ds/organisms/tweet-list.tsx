@@ -36,6 +36,8 @@ const TweetList = ({
             username={feed.username}
             content={feed.content}
             comments={feed.comments}
+            likeCount={feed.like_count}
+            likedByMe={feed.liked_by_me}
             likes={feed.likes}
             profile={profile}
           />
@@ -1,11 +1,22 @@
 import { createAsyncThunk } from "@reduxjs/toolkit";
 import { TweetApi } from "../services";
+import type { UserProfile } from "@/store/tweetSlice";
+
+// Feeds report liked_by_me for the viewer, so they need the viewer's username
+const viewerUsername = async (getState: () => unknown): Promise<string> => {
+  const { tweet } = getState() as { tweet: { profile: UserProfile } };
+  return (
+    tweet.profile.user.username || (await TweetApi.getProfile()).user.username
+  );
+};
 
 export const fetchTweetsAction = createAsyncThunk(
   "tweet/loadFeeds",
-  async (_, { rejectWithValue }) => {
+  async (_, { getState, rejectWithValue }) => {
     try {
-      const response = await TweetApi.getTweets();
+      const response = await TweetApi.getTweets(
+        await viewerUsername(getState)
+      );
       return response;
     } catch (error) {
       return rejectWithValue(
@@ -40,9 +51,12 @@ export const createTweetAction = createAsyncThunk(
 
 export const searchTweetsAction = createAsyncThunk(
   "tweet/searchFeeds",
-  async (query: string, { rejectWithValue }) => {
+  async (query: string, { getState, rejectWithValue }) => {
     try {
-      const response = await TweetApi.searchTweets(query);
+      const response = await TweetApi.searchTweets(
+        query,
+        await viewerUsername(getState)
+      );
       return response;
     } catch (error) {
       return rejectWithValue(
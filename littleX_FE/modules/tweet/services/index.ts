@@ -2,10 +2,26 @@ import { Comment, TweetNode } from "@/nodes/tweet-node";
 import { private_api } from "@/_core/api-client";
 import { User, UserProfile } from "@/store/tweetSlice";
 
+// run_server.py sends like_count and liked_by_me; the Jac backend
+// (littleX.jac) still sends the whole likes list instead
+const likeFields = (tweet: any, username?: string) => {
+  const likes: string[] | undefined = Array.isArray(tweet?.likes)
+    ? tweet.likes
+    : undefined;
+  const viewer = username?.toLowerCase();
+  return {
+    like_count: tweet?.like_count ?? likes?.length ?? 0,
+    liked_by_me:
+      tweet?.liked_by_me ??
+      (!!viewer && !!likes?.some((person) => person.toLowerCase() === viewer)),
+    likes,
+  };
+};
+
 export const TweetApi = {
   // Create a new tweet
-  getTweets: async () => {
-    const res = await private_api.post("/walker/load_feed", {});
+  getTweets: async (username?: string) => {
+    const res = await private_api.post("/walker/load_feed", { username });
     const data = res.data?.reports?.[0] || [];
 
     return data.map((entry: any) => {
@@ -16,16 +32,17 @@ export const TweetApi = {
         username: tweet?.username ?? "",
         content: tweet?.content ?? "",
         embedding: tweet?.embedding ?? [],
-        likes: Array.isArray(tweet?.likes) ? tweet.likes : [],
+        ...likeFields(tweet, username),
         comments: Array.isArray(tweet?.comments) ? tweet.comments : [],
         created_at: tweet?.created_at ?? "",
       } as TweetNode;
     }) as TweetNode[];
   },
 
-  searchTweets: async (query: string) => {
+  searchTweets: async (query: string, username?: string) => {
     const res = await private_api.post("/walker/load_feed", {
       search: query,
+      username,
     });
     const data = res.data?.reports?.[0] || [];
 
@@ -37,7 +54,7 @@ export const TweetApi = {
         username: tweet?.username ?? "",
         content: tweet?.content ?? "",
         embedding: tweet?.embedding ?? [],
-        likes: Array.isArray(tweet?.likes) ? tweet.likes : [],
+        ...likeFields(tweet, username),
         comments: Array.isArray(tweet?.comments) ? tweet.comments : [],
         created_at: tweet?.created_at ?? "",
       } as TweetNode;
@@ -69,7 +86,8 @@ export const TweetApi = {
       content: tweet?.context?.content || "",
       embedding: tweet?.context?.embedding || [],
       id: tweet?.id || "",
-      likes: [],
+      like_count: 0,
+      liked_by_me: false,
       username: tweet?.context?.username || "",
       created_at: tweet?.context?.created_at || new Date().toISOString(),
     };
@@ -108,6 +126,8 @@ export const TweetApi = {
     return {
       id: data.id,
       username: username,
+      like_count: data.like_count as number | undefined,
+      likes: Array.isArray(data.likes) ? (data.likes as string[]) : undefined,
     };
   },
   removeLike: async (id: string, username: string) => {
@@ -118,8 +138,15 @@ export const TweetApi = {
     return {
       id: data.id,
       username: username,
+      like_count: data.like_count as number | undefined,
+      likes: Array.isArray(data.likes) ? (data.likes as string[]) : undefined,
     };
   },
+  // run_server.py feeds only carry a like count; the likers are fetched on demand
+  getLikes: async (id: string) => {
+    const response = await private_api.get(`/tweets/${id}/likes`);
+    return (response.data?.likes || []) as string[];
+  },
 
   loadAllTheUserProfiles: async () => {
     // Then get all users
@@ -50,6 +50,8 @@ export default function ProfilePage() {
                   username={feed.username}
                   content={feed.content}
                   comments={feed.comments}
+                  likeCount={feed.like_count}
+                  likedByMe={feed.liked_by_me}
                   likes={feed.likes}
                   profile={userData}
                 />
@@ -3,7 +3,9 @@ export interface TweetNode {
   username: string;
   content: string;
   embedding: number[];
-  likes: string[]; // or array of user IDs
+  like_count: number;
+  liked_by_me: boolean; // whether the viewer likes it
+  likes?: string[]; // only from backends that send every liker (littleX.jac)
   comments: Comment[]; // or array of comment IDs
   created_at?: "";
 }
@@ -204,7 +204,14 @@ export const tweetSlice = createSlice({
       state.successMessage = "Tweet liked successfully";
       state.items = state.items.map((tweet) =>
         tweet.id === action.payload.id
-          ? { ...tweet, likes: [...tweet.likes, action.payload.username] }
+          ? {
+              ...tweet,
+              like_count: action.payload.like_count ?? tweet.like_count + 1,
+              liked_by_me: true,
+              likes:
+                action.payload.likes ??
+                (tweet.likes && [...tweet.likes, action.payload.username]),
+            }
           : tweet
       );
 
@@ -233,9 +240,12 @@ export const tweetSlice = createSlice({
         tweet.id === action.payload.id
           ? {
               ...tweet,
-              likes: tweet.likes.filter(
-                (like) => like !== action.payload.username
-              ),
+              like_count:
+                action.payload.like_count ?? Math.max(tweet.like_count - 1, 0),
+              liked_by_me: false,
+              likes:
+                action.payload.likes ??
+                tweet.likes?.filter((like) => like !== action.payload.username),
             }
           : tweet
       );